@@ -1,8 +1,40 @@
-import httpx
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 from app.config import settings
+from app.core.http import http_clients
+
+@dataclass
+class JobOffersResponse:
+    offers: Optional[List[Dict[str, Any]]]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.offers is None
 
 async def get_job_offers():
-    async with httpx.AsyncClient(timeout=settings.API_TIMEOUT) as client:
-        response = await client.get(settings.JOB_API_URL)
-        response.raise_for_status()
-        return response.json()
+    client = http_clients.get("job_api")
+    response = await client.get(settings.JOB_API_URL)
+    response.raise_for_status()
+    return response.json()
+
+async def get_job_offers_if_changed(etag: Optional[str] = None, last_modified: Optional[str] = None) -> JobOffersResponse:
+    """
+    Conditional GET on JOB_API_URL: `offers` is None when the feed answered 304.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    client = http_clients.get("job_api")
+    response = await client.get(settings.JOB_API_URL, headers=headers)
+    if response.status_code == 304:
+        return JobOffersResponse(offers=None, etag=etag, last_modified=last_modified)
+    response.raise_for_status()
+    return JobOffersResponse(
+        offers=response.json(),
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
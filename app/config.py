@@ -7,16 +7,39 @@ class Settings(BaseSettings):
     PROJECT_VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
 
+    # Observability 
+    LOG_LEVEL: str = "INFO"
+    # /metrics et /health/upstreams (désactivés par défaut : ils décrivent l'état interne)
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""  # si défini, exigé en Authorization: Bearer <jeton>
+
     # JWT 
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    JWT_BACKEND: str = "jose"  # jose ou pyjwt (paquet PyJWT optionnel)
+    JWT_CACHE_ENABLED: bool = True
+    JWT_CACHE_MAX_ENTRIES: int = 10000
+
+    # Password hashing 
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
 
     # Email 
     SENDER_EMAIL: str
     GMAIL_USER: str
     GMAIL_PASSWORD: str
     RESEND_API_KEY: str
+    CONTACT_EMAIL_PROVIDER: str = "resend"  # resend ou fake (emails gardés en mémoire)
+    CONTACT_OUTBOX_CONCURRENCY: int = 2
+    CONTACT_OUTBOX_RATE_PER_SECOND: float = 2.0
+    CONTACT_OUTBOX_MAX_ATTEMPTS: int = 8
+    CONTACT_OUTBOX_BACKOFF_BASE_SECONDS: float = 5.0
+    CONTACT_OUTBOX_BACKOFF_MAX_SECONDS: float = 3600.0
+    CONTACT_OUTBOX_POLL_SECONDS: float = 10.0
+    CONTACT_OUTBOX_LEASE_SECONDS: float = 120.0
+    CONTACT_OUTBOX_SENT_TTL_DAYS: int = 7
 
     # MongoDB 
     MONGO_URI: str
@@ -24,21 +47,97 @@ class Settings(BaseSettings):
     MONGO_CV_COLLECTION: str
     MONGO_INTERVIEW_COLLECTION: str
     MONGO_FEEDBACK_COLLECTION: str
+    MONGO_CV_PARSE_CACHE_COLLECTION: str = "cv_parse_cache"
+    MONGO_CONTACT_OUTBOX_COLLECTION: str = "contact_outbox"
+    MONGO_CV_PROCESSING_COLLECTION: str = "cv_processing"
+    MONGO_ENSURE_INDEXES_ON_STARTUP: bool = True
+    MONGO_PROFILER_ENABLED: bool = False  # journalise les requêtes lentes (listener pymongo)
+    MONGO_PROFILER_THRESHOLD_MS: float = 100.0
+    MONGO_PROFILER_MAX_ENTRIES: int = 200
+    MONGO_PROFILER_EXPLAIN: bool = True  # plan d'exécution des requêtes lentes (explain queryPlanner)
 
     # PostgreSQL 
     DATABASE_URL: str
     ASYNC_DATABASE_URL: str
+    DB_POOL_MODE: str = "null"  # null (une connexion par session) ou queue (pool)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = True
 
     # External APIs 
     API_TIMEOUT: int = 80
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False
     JOB_API_URL: str
     DATA_ACCESS_API_URL: str
     CV_API_URL: str
 
+    # Upstream resilience 
+    UPSTREAM_RESILIENCE_ENABLED: bool = True
+    REQUEST_DEADLINE_SECONDS: float = 90.0  # budget d'une requête entrante, réduit par l'en-tête X-Request-Timeout
+    UPSTREAM_BULKHEAD_MAX_WAITING: int = 50  # appels en attente par service amont au-delà du pool
+    UPSTREAM_BREAKER_FAILURE_RATE: float = 0.5
+    UPSTREAM_BREAKER_SLOW_CALL_RATE: float = 0.8
+    UPSTREAM_BREAKER_WINDOW: int = 50
+    UPSTREAM_BREAKER_MIN_CALLS: int = 20
+    UPSTREAM_BREAKER_OPEN_SECONDS: float = 30.0
+    UPSTREAM_RETRY_ATTEMPTS: int = 2  # requêtes idempotentes uniquement
+    UPSTREAM_RETRY_BUDGET_RATIO: float = 0.1
+    UPSTREAM_TIMEOUT_MULTIPLIER: float = 3.0  # délai de lecture = p99 observé x multiplicateur
+    UPSTREAM_TIMEOUT_MIN_SECONDS: float = 2.0
+    CV_API_SLOW_CALL_SECONDS: float = 60.0
+    CV_API_TIMEOUT_MIN_SECONDS: float = 30.0
+    DATA_ACCESS_SLOW_CALL_SECONDS: float = 5.0
+    GOOGLE_SLOW_CALL_SECONDS: float = 5.0
+
+    # Jobs cache 
+    JOBS_CACHE_MAX_AGE: int = 300
+    JOBS_REFRESH_INTERVAL_MINUTES: int = 60
+    JOBS_INCREMENTAL_SYNC: bool = True
+    JOBS_SNAPSHOT_PATH: str = ".cache/job_offers.snapshot"
+    JOBS_SNAPSHOT_MAX_STALENESS_MINUTES: int = 24 * 60
+    JOBS_SHARED_CACHE: bool = False
+    JOBS_SHARED_POLL_SECONDS: int = 30
+    JOBS_REFRESH_RETRY_SECONDS: int = 60  # premier délai avant de retenter une mise à jour échouée
+
+    # CV cache 
+    CV_CACHE_MAX_ENTRIES: int = 1000
+    CV_CACHE_MAX_BYTES: int = 50 * 1024 * 1024
+    CV_CACHE_TTL_SECONDS: int = 3600
+
+    # CV upload 
+    CV_UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    CV_UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    CV_PIPELINE_CONCURRENCY: int = 4
+    CV_PIPELINE_QUEUE_SIZE: int = 100
+    CV_PIPELINE_RESULT_TTL_SECONDS: int = 3600
+
+    # CV parse cache (content-addressed) 
+    CV_PARSE_CACHE_ENABLED: bool = True
+    CV_PARSER_VERSION: str = "1"
+    CV_PARSE_CACHE_TTL_DAYS: int = 30
+
+    # Authenticated-user cache 
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+
     # Google OAuth 
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
     GOOGLE_REDIRECT_URI: str = "http://localhost:8000/api/v1/auth/oauth/google/callback"
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_USERINFO_URL: str = "https://www.googleapis.com/oauth2/v2/userinfo"
+    GOOGLE_JWKS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
+    GOOGLE_ID_TOKEN_ISSUERS: list[str] = ["https://accounts.google.com", "accounts.google.com"]
+    GOOGLE_VERIFY_ID_TOKEN: bool = True
+    GOOGLE_JWKS_DEFAULT_MAX_AGE_SECONDS: int = 3600
+    GOOGLE_JWKS_MIN_REFRESH_SECONDS: int = 60
+    GOOGLE_JWKS_REFRESH_MARGIN_SECONDS: int = 600
 
     # Frontend URLs 
     FRONTEND_URL: str = "http://localhost:5173"
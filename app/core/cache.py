@@ -0,0 +1,126 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+
+def json_size(value: Any) -> int:
+    """
+    Approximate memory cost of a JSON-like value: the length of its JSON encoding.
+    """
+    return len(json.dumps(value, default=str, separators=(",", ":")))
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    expires_at: Optional[float]
+
+
+class BoundedCache:
+    """
+    In-process LRU cache bounded by entry count and approximate size in bytes,
+    with a default TTL that each `set` can override.
+
+    Every operation is synchronous and never awaits, so when used from the
+    event loop it needs no lock: reads never wait behind writers.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = json_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry)
+
+    def _expired(self, entry: _Entry) -> bool:
+        return entry.expires_at is not None and entry.expires_at <= self._clock()
+
+    def _remove(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if self._expired(entry):
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        self._remove(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.rejections += 1
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self._clock() + ttl if ttl is not None else None
+        self._entries[key] = _Entry(value, size, expires_at)
+        self.current_bytes += size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.current_bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        return self._remove(key) is not None
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove `key` and return its live value; not counted as a hit or miss.
+        """
+        entry = self._remove(key)
+        if entry is None or self._expired(entry):
+            return default
+        return entry.value
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejections": self.rejections,
+        }
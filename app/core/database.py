@@ -1,31 +1,121 @@
+from typing import Optional
+from uuid import uuid4
 from motor.motor_asyncio import AsyncIOMotorClient
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.core.metrics import db_acquire_duration, metrics
+from app.core.mongo_profiler import SlowQueryProfiler, pymongo_explainer
 import ssl
-from sqlalchemy.pool import NullPool
+import time
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 import logging
-mongo_client = AsyncIOMotorClient(settings.MONGO_URI)
+mongo_profiler: Optional[SlowQueryProfiler] = None
+if settings.MONGO_PROFILER_ENABLED:
+    mongo_profiler = SlowQueryProfiler(
+        settings.MONGO_PROFILER_THRESHOLD_MS,
+        settings.MONGO_PROFILER_MAX_ENTRIES,
+        explain=pymongo_explainer(settings.MONGO_URI) if settings.MONGO_PROFILER_EXPLAIN else None,
+    )
+    metrics.collected(
+        "mongo_slow_queries_total", "MongoDB commands slower than MONGO_PROFILER_THRESHOLD_MS.", "counter",
+        lambda: [({}, mongo_profiler.slow_queries)],
+    )
+    metrics.collected(
+        "mongo_collection_scans_total", "Slow MongoDB commands whose explained plan is a collection scan.", "counter",
+        lambda: [({}, mongo_profiler.collection_scans)],
+    )
+mongo_client = AsyncIOMotorClient(
+    settings.MONGO_URI,
+    event_listeners=[mongo_profiler] if mongo_profiler else [],
+)
 mongo_db = mongo_client[settings.MONGO_DB_NAME]
 
+POOL_MODES = ("null", "queue")
 
-connect_args = {"statement_cache_size": 0}
+def pgbouncer_connect_args() -> dict:
+    """
+    Derrière pgbouncer en mode transaction, deux transactions successives peuvent
+    tomber sur deux connexions serveur différentes : les requêtes préparées nommées
+    d'asyncpg n'y sont pas réutilisables. On coupe ses caches et on donne un nom
+    unique à chaque requête préparée pour éviter les collisions entre clients.
+    """
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
 
-engine = create_async_engine(
-    str(settings.ASYNC_DATABASE_URL),
-    poolclass=NullPool,
-    connect_args=connect_args,  
-    execution_options={"compiled_cache": None},
-)
+class TimedNullPool(NullPool):
+    """NullPool mesurant l'ouverture de chaque connexion (db_connection_acquire_seconds)."""
 
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_acquire_duration.observe(time.perf_counter() - started, "null")
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Pool mesurant l'attente d'une connexion libre (ou son ouverture)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_acquire_duration.observe(time.perf_counter() - started, "queue")
+
+# SQLAlchemy nomme le logger d'un pool d'après sa classe : hors de l'espace "sqlalchemy",
+# les pools ci-dessus journaliseraient chaque recyclage au niveau INFO de l'application.
+for _pool_class in (TimedNullPool, TimedQueuePool):
+    logging.getLogger(f"{_pool_class.__module__}.{_pool_class.__name__}").setLevel(logging.WARNING)
+
+def build_engine(
+    url: Optional[str] = None,
+    pool_mode: Optional[str] = None,
+    pgbouncer: Optional[bool] = None,
+) -> AsyncEngine:
+    """
+    Moteur asynchrone selon DB_POOL_MODE :
+    - "null" : une connexion asyncpg ouverte puis fermée à chaque session ;
+    - "queue" : pool de DB_POOL_SIZE connexions (+ DB_MAX_OVERFLOW), recyclées
+      après DB_POOL_RECYCLE secondes et vérifiées avant usage si DB_POOL_PRE_PING.
+    Le cache de compilation SQLAlchemy est côté client et reste actif dans tous les cas.
+    """
+    pool_mode = pool_mode or settings.DB_POOL_MODE
+    if pool_mode not in POOL_MODES:
+        raise ValueError(f"DB_POOL_MODE inconnu: {pool_mode} (attendu: {', '.join(POOL_MODES)})")
+    if pgbouncer is None:
+        pgbouncer = settings.DB_PGBOUNCER_TRANSACTION_MODE
+
+    options = {"connect_args": pgbouncer_connect_args() if pgbouncer else {}}
+    if pool_mode == "null":
+        options["poolclass"] = TimedNullPool
+    else:
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    return create_async_engine(url or str(settings.ASYNC_DATABASE_URL), **options)
+
+def build_sessionmaker(bind: AsyncEngine) -> sessionmaker:
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+engine = build_engine()
+
+SessionLocal = build_sessionmaker(engine)
 
 async def get_db():
     async with SessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
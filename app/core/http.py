@@ -0,0 +1,228 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+import httpx
+from app.config import settings
+from app.core.metrics import metrics, record_upstream
+from app.core.resilience import ResiliencePolicy, ResilientTransport, UpstreamResilience
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class UpstreamConfig:
+    timeout: httpx.Timeout
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    retries: int = 0
+    verify: bool | str = True
+    headers: Dict[str, str] = field(default_factory=dict)
+    resilience: Optional[ResiliencePolicy] = None
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Records latency and outcome of every request sent through the wrapped transport.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstream: str):
+        self.transport = transport
+        self.upstream = upstream
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TransportError as e:
+            record_upstream(self.upstream, type(e).__name__, time.perf_counter() - started)
+            raise
+        record_upstream(self.upstream, str(response.status_code), time.perf_counter() - started)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class HttpClientRegistry:
+    """
+    One pooled `httpx.AsyncClient` per upstream, created on first use and
+    closed together by the application lifespan.
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, UpstreamConfig] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._resilience: Dict[str, UpstreamResilience] = {}
+
+    def register(self, name: str, config: UpstreamConfig):
+        self._configs[name] = config
+        if config.resilience is not None:
+            self._resilience[name] = UpstreamResilience(name, config.resilience)
+        else:
+            self._resilience.pop(name, None)
+
+    def config(self, name: str) -> UpstreamConfig:
+        return self._configs[name]
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        config = self._configs[name]
+        http2 = config.http2 and HTTP2_AVAILABLE
+        if config.http2 and not HTTP2_AVAILABLE:
+            logger.warning(f"HTTP/2 requested for upstream '{name}' but the 'h2' package is not installed")
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            http2=http2,
+            retries=config.retries,
+            verify=config.verify,
+        )
+        transport = InstrumentedTransport(transport, name)
+        if name in self._resilience:
+            transport = ResilientTransport(transport, self._resilience[name])
+        return httpx.AsyncClient(transport=transport, timeout=config.timeout, headers=config.headers)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._build(name)
+        return client
+
+    def resilience(self, name: str) -> Optional[UpstreamResilience]:
+        return self._resilience.get(name)
+
+    def resilience_status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: resilience.status() for name, resilience in self._resilience.items()}
+
+    def open_all(self):
+        for name in self._configs:
+            self.get(name)
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+def _resilience_policy(
+    max_concurrent: int,
+    slow_call_seconds: float,
+    timeout_max: float,
+    timeout_min: Optional[float] = None,
+    propagate_deadline: bool = True,
+) -> Optional[ResiliencePolicy]:
+    if not settings.UPSTREAM_RESILIENCE_ENABLED:
+        return None
+    return ResiliencePolicy(
+        max_concurrent=max_concurrent,
+        max_waiting=settings.UPSTREAM_BULKHEAD_MAX_WAITING,
+        slow_call_seconds=slow_call_seconds,
+        timeout_min=timeout_min or settings.UPSTREAM_TIMEOUT_MIN_SECONDS,
+        timeout_max=timeout_max,
+        timeout_multiplier=settings.UPSTREAM_TIMEOUT_MULTIPLIER,
+        failure_rate_threshold=settings.UPSTREAM_BREAKER_FAILURE_RATE,
+        slow_call_rate_threshold=settings.UPSTREAM_BREAKER_SLOW_CALL_RATE,
+        window=settings.UPSTREAM_BREAKER_WINDOW,
+        minimum_calls=settings.UPSTREAM_BREAKER_MIN_CALLS,
+        open_seconds=settings.UPSTREAM_BREAKER_OPEN_SECONDS,
+        retry_attempts=settings.UPSTREAM_RETRY_ATTEMPTS,
+        retry_budget_ratio=settings.UPSTREAM_RETRY_BUDGET_RATIO,
+        propagate_deadline=propagate_deadline,
+    )
+
+
+def _default_config(
+    timeout: httpx.Timeout,
+    slow_call_seconds: float,
+    timeout_min: Optional[float] = None,
+    propagate_deadline: bool = True,
+    **overrides,
+) -> UpstreamConfig:
+    options = dict(
+        timeout=timeout,
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        http2=settings.HTTP2_ENABLED,
+    )
+    options.update(overrides)
+    # Bulkhead sized like the connection pool: extra calls would only queue for a connection.
+    options.setdefault("resilience", _resilience_policy(
+        options["max_connections"], slow_call_seconds, timeout.read or settings.API_TIMEOUT, timeout_min, propagate_deadline
+    ))
+    return UpstreamConfig(**options)
+
+
+http_clients = HttpClientRegistry()
+# slow_call_seconds: latency beyond which a call counts as slow for the circuit breaker.
+http_clients.register("cv_api", _default_config(
+    httpx.Timeout(settings.API_TIMEOUT, connect=10.0),
+    slow_call_seconds=settings.CV_API_SLOW_CALL_SECONDS,
+    # Durée de parsing très variable selon le CV : plancher haut pour le délai adaptatif.
+    timeout_min=settings.CV_API_TIMEOUT_MIN_SECONDS,
+))
+http_clients.register("data_access", _default_config(
+    httpx.Timeout(settings.API_TIMEOUT, connect=10.0),
+    slow_call_seconds=settings.DATA_ACCESS_SLOW_CALL_SECONDS,
+))
+http_clients.register("job_api", _default_config(
+    httpx.Timeout(settings.API_TIMEOUT),
+    slow_call_seconds=settings.API_TIMEOUT,
+    max_connections=2,
+    max_keepalive_connections=1,
+))
+http_clients.register("google", _default_config(
+    httpx.Timeout(30.0, connect=10.0),
+    slow_call_seconds=settings.GOOGLE_SLOW_CALL_SECONDS,
+    # API tierce : notre délai de requête ne la concerne pas.
+    propagate_deadline=False,
+    retries=3,
+    headers={"User-Agent": "AI-Interview-Backend/1.0", "Accept": "application/json"},
+))
+
+_CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _resilience_samples(read):
+    def collect():
+        for name, status in http_clients.resilience_status().items():
+            for labels, value in read(status):
+                yield {"upstream": name, **labels}, value
+    return collect
+
+
+metrics.collected(
+    "upstream_circuit_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open.", "gauge",
+    _resilience_samples(lambda status: [({}, _CIRCUIT_STATES[status["state"]])]),
+)
+metrics.collected(
+    "upstream_circuit_opened_total", "Times the circuit breaker opened.", "counter",
+    _resilience_samples(lambda status: [({}, status["times_opened"])]),
+)
+metrics.collected(
+    "upstream_in_flight", "Calls currently holding a bulkhead slot.", "gauge",
+    _resilience_samples(lambda status: [({}, status["in_flight"])]),
+)
+metrics.collected(
+    "upstream_rejected_total", "Calls refused without reaching the upstream, by reason.", "counter",
+    _resilience_samples(lambda status: [({"reason": reason}, count) for reason, count in status["rejections"].items()]),
+)
+metrics.collected(
+    "upstream_retries_total", "Retries of idempotent calls.", "counter",
+    _resilience_samples(lambda status: [({}, status["retries"])]),
+)
+metrics.collected(
+    "upstream_read_timeout_seconds", "Current adaptive read timeout.", "gauge",
+    _resilience_samples(lambda status: [({}, status["read_timeout_seconds"])]),
+)
@@ -0,0 +1,305 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; spans a cache hit (sub-millisecond) to the slowest upstream calls.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        pass
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter. Label values are passed positionally, in `labelnames` order.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, self._labels(labels), value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, self._labels(labels), value
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram: observe() is a bisect and three additions.
+    Quantiles are left to the scraper (histogram_quantile).
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = [(labels, list(state[0]), state[1], state[2]) for labels, state in self._values.items()]
+        for labels, counts, total, count in values:
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**base, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", base, total
+            yield f"{self.name}_count", base, count
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class _Collected(_Metric):
+    """
+    Metric whose samples are read from a callback at scrape time
+    (e.g. the counters a cache already keeps).
+    """
+
+    def __init__(self, name: str, documentation: str, type: str, collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        super().__init__(name, documentation)
+        self.type = type
+        self._collect = collect
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._collect():
+            yield self.name, labels, value
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text format by GET /metrics.
+    Each worker process exposes its own values.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collected(
+        self,
+        name: str,
+        documentation: str,
+        type: str,
+        collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]],
+    ):
+        self._register(_Collected(name, documentation, type, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            samples = list(metric.samples())
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests handled, by endpoint and status.", ("method", "handler", "status")
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "Time to the end of the response body, by endpoint.", ("method", "handler")
+)
+upstream_requests = metrics.counter(
+    "upstream_requests_total", "Calls to upstream services, by outcome (HTTP status or error class).", ("upstream", "outcome")
+)
+upstream_request_duration = metrics.histogram(
+    "upstream_request_duration_seconds", "Upstream call latency, until the response headers.", ("upstream",)
+)
+db_acquire_duration = metrics.histogram(
+    "db_connection_acquire_seconds", "Time to get a PostgreSQL connection from the pool (or to open one without pool).", ("pool",)
+)
+
+# Registered BoundedCache instances, exported by the collectors below.
+_caches: Dict[str, object] = {}
+
+
+def register_cache(name: str, cache) -> None:
+    """
+    Export a BoundedCache's hits, misses, evictions and size under cache="<name>".
+    """
+    _caches[name] = cache
+
+
+def _cache_samples(attribute: str) -> Callable[[], Iterable[Tuple[Dict[str, str], float]]]:
+    def collect():
+        for name, cache in list(_caches.items()):
+            value = len(cache) if attribute == "entries" else getattr(cache, attribute)
+            yield {"cache": name}, value
+    return collect
+
+
+metrics.collected("cache_hits_total", "Cache lookups answered from the cache.", "counter", _cache_samples("hits"))
+metrics.collected("cache_misses_total", "Cache lookups that missed (absent or expired).", "counter", _cache_samples("misses"))
+metrics.collected("cache_evictions_total", "Entries evicted to respect the cache bounds.", "counter", _cache_samples("evictions"))
+metrics.collected("cache_entries", "Entries currently cached.", "gauge", _cache_samples("entries"))
+metrics.collected("cache_bytes", "Estimated size of the cached values.", "gauge", _cache_samples("current_bytes"))
+
+
+def record_upstream(upstream: str, outcome: str, seconds: Optional[float] = None):
+    upstream_requests.inc(upstream, outcome)
+    if seconds is not None:
+        upstream_request_duration.observe(seconds, upstream)
+
+
+def _handler_name(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "name", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request, labelled by the name of the
+    endpoint that handled it (search_job_offers, not the raw path) so that label
+    cardinality stays bounded; requests no route matched count as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            handler = _handler_name(scope)
+            http_requests.inc(scope["method"], handler, str(status))
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], handler)
@@ -0,0 +1,150 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+PROFILED_COMMANDS = frozenset({"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"})
+# Session and transport fields the explain command must not carry.
+_SESSION_FIELDS = frozenset({
+    "lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern",
+    "$db", "$clusterTime", "$readPreference", "apiVersion", "apiStrict", "apiDeprecationErrors",
+})
+
+
+def plan_summary(explain: Dict[str, Any]) -> str:
+    """
+    Compact description of the winning plan, e.g. "IXSCAN user_id_1 > FETCH" or "COLLSCAN".
+    """
+    planner = explain.get("queryPlanner")
+    if planner is None:
+        # aggregate: the plan of the first $cursor stage
+        for stage in explain.get("stages", []):
+            if "$cursor" in stage:
+                planner = stage["$cursor"].get("queryPlanner")
+                break
+    if planner is None:
+        return "unknown"
+    stages = []
+    plan = planner.get("winningPlan", {})
+    plan = plan.get("queryPlan", plan)
+    while plan:
+        name = plan.get("stage", "?")
+        stages.append(f"{name} {plan['indexName']}" if "indexName" in plan else name)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " > ".join(reversed(stages))
+
+
+class SlowQueryProfiler(monitoring.CommandListener):
+    """
+    Opt-in pymongo command listener: queries slower than `threshold_ms` are
+    recorded with their duration and, when `explain` is given, the plan the
+    server chose. Explains run in a background thread on a separate client
+    (never in the driver's callback), and are dropped when that thread lags.
+    Every slow query is logged as a warning, with its plan once known.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        max_entries: int = 200,
+        explain: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+        explain_queue_size: int = 100,
+    ):
+        self.threshold_ms = threshold_ms
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self.slow_queries = 0
+        self.collection_scans = 0
+        self._explain = explain
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._explains: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=explain_queue_size)
+        if explain is not None:
+            threading.Thread(target=self._explain_worker, name="mongo-explain", daemon=True).start()
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name not in PROFILED_COMMANDS:
+            return
+        command = {key: value for key, value in event.command.items() if key not in _SESSION_FIELDS}
+        with self._lock:
+            self._pending[event.request_id] = {"database": event.database_name, "command": command}
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        with self._lock:
+            pending = self._pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+        command = pending["command"]
+        entry = {
+            "command": event.command_name,
+            "collection": command.get(event.command_name),
+            "duration_ms": round(duration_ms, 2),
+            "query": command.get("filter") or command.get("query") or command.get("pipeline") or command.get("updates") or command.get("deletes"),
+            "plan": None,
+            "at": time.time(),
+        }
+        self.slow_queries += 1
+        self.entries.append(entry)
+        if self._explain is None:
+            self._log(entry)
+            return
+        try:
+            self._explains.put_nowait({"entry": entry, "database": pending["database"], "command": command})
+        except queue.Full:
+            entry["plan"] = "explain skipped: queue full"
+            self._log(entry)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        with self._lock:
+            self._pending.pop(event.request_id, None)
+
+    def _explain_worker(self):
+        while True:
+            job = self._explains.get()
+            entry = job["entry"]
+            try:
+                entry["plan"] = plan_summary(self._explain(job["database"], job["command"]))
+            except Exception as e:
+                entry["plan"] = f"explain failed: {e}"
+            if "COLLSCAN" in entry["plan"]:
+                self.collection_scans += 1
+            self._log(entry)
+
+    def _log(self, entry: Dict[str, Any]):
+        plan = entry["plan"] or "plan non demandé"
+        label = "Requête lente sans index" if "COLLSCAN" in plan else "Requête lente"
+        logger.warning(
+            f"{label} {entry['command']} sur {entry['collection']} ({entry['duration_ms']} ms, {plan}): {entry['query']}"
+        )
+
+    def report(self) -> List[Dict[str, Any]]:
+        return list(self.entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "slow_queries": self.slow_queries,
+            "collection_scans": self.collection_scans,
+            "recorded": len(self.entries),
+        }
+
+
+def pymongo_explainer(uri: str, verbosity: str = "queryPlanner") -> Callable[[str, Dict[str, Any]], Dict[str, Any]]:
+    """
+    explain() through a dedicated synchronous client, so the explains are not profiled themselves.
+    """
+    from pymongo import MongoClient
+
+    client = MongoClient(uri)
+
+    def explain(database: str, command: Dict[str, Any]) -> Dict[str, Any]:
+        return client[database].command({"explain": command, "verbosity": verbosity})
+
+    return explain
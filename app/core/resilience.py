@@ -0,0 +1,514 @@
+import asyncio
+import contextvars
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+import httpx
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUSES = frozenset({502, 503, 504})
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# Monotonic time by which the current request must be answered (None: no deadline).
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class UpstreamUnavailableError(httpx.TransportError):
+    """
+    Call refused before reaching the upstream. Subclasses httpx.TransportError
+    so callers handling httpx failures handle these too.
+    """
+
+    retry_after: float = 1.0
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"circuit open for upstream '{upstream}'")
+        self.retry_after = retry_after
+
+
+class BulkheadFullError(UpstreamUnavailableError):
+    def __init__(self, upstream: str):
+        super().__init__(f"too many concurrent calls to upstream '{upstream}'")
+
+
+class DeadlineExceededError(UpstreamUnavailableError):
+    def __init__(self, upstream: str):
+        super().__init__(f"request deadline exceeded before calling upstream '{upstream}'")
+
+
+# Deadlines
+
+def remaining_time() -> Optional[float]:
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Run the block with a deadline `seconds` from now, never later than an enclosing one.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    """
+    Pure ASGI middleware giving every HTTP request a deadline: `default_seconds`,
+    shortened by an X-Request-Timeout header (seconds) sent by the caller.
+    Upstream calls made while handling the request share what is left of it.
+    """
+
+    def __init__(self, app, default_seconds: float):
+        self.app = app
+        self.default_seconds = default_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        seconds = self.default_seconds
+        for name, value in scope["headers"]:
+            if name == b"x-request-timeout":
+                try:
+                    requested = float(value)
+                except ValueError:
+                    break
+                if requested > 0:
+                    seconds = min(seconds, requested)
+                break
+        with deadline_scope(seconds):
+            await self.app(scope, receive, send)
+
+
+# Building blocks
+
+class Bulkhead:
+    """
+    At most `max_concurrent` calls in flight and `max_waiting` queued; beyond
+    that, or once the wait outlasts `max_wait`, the call is refused at once.
+    """
+
+    def __init__(self, max_concurrent: int, max_waiting: int):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self, max_wait: Optional[float]) -> bool:
+        if self._slots.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), max_wait)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+
+class CircuitBreaker:
+    """
+    Count-based breaker over the last `window` calls. It opens when, with at
+    least `minimum_calls` recorded, the failure rate or the rate of calls
+    slower than `slow_call_seconds` crosses its threshold. After `open_seconds`
+    it lets `half_open_calls` probes through: all succeed -> closed, any
+    failure -> open again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        window: int,
+        minimum_calls: int,
+        failure_rate_threshold: float,
+        slow_call_seconds: float,
+        slow_call_rate_threshold: float,
+        open_seconds: float,
+        half_open_calls: int,
+        clock=time.monotonic,
+    ):
+        self.window = window
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self.state = self.CLOSED
+        self._outcomes: Deque[tuple] = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self.opened = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - self._clock())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.state = self.HALF_OPEN
+            self._probes = self._probe_successes = 0
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                return False
+            self._probes += 1
+        return True
+
+    def record(self, failed: bool, duration: float):
+        slow = duration >= self.slow_call_seconds
+        if self.state == self.OPEN:
+            return  # calls started before the breaker opened
+        if self.state == self.HALF_OPEN:
+            if failed or slow:
+                self._open()
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_calls:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+            return
+        self._outcomes.append((failed, slow))
+        calls = len(self._outcomes)
+        if calls < self.minimum_calls:
+            return
+        failures = sum(1 for outcome in self._outcomes if outcome[0])
+        slow_calls = sum(1 for outcome in self._outcomes if outcome[1])
+        if failures / calls >= self.failure_rate_threshold or slow_calls / calls >= self.slow_call_rate_threshold:
+            self._open()
+
+    def release_probe(self):
+        """A half-open probe ended without an outcome (e.g. cut by the caller's deadline)."""
+        if self.state == self.HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def failure_rate(self) -> float:
+        calls = len(self._outcomes)
+        return sum(1 for outcome in self._outcomes if outcome[0]) / calls if calls else 0.0
+
+
+class RetryBudget:
+    """
+    Retries allowed over the last `ttl` seconds: `ratio` of the requests made,
+    plus `min_per_second` so that a quiet upstream can still be retried.
+    Bounds the extra load retries add when an upstream is failing.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, ttl: float = 10.0, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.ttl = ttl
+        self._clock = clock
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.exhausted = 0
+
+    def _prune(self, now: float):
+        for events in (self._requests, self._retries):
+            while events and events[0] < now - self.ttl:
+                events.popleft()
+
+    def record_request(self):
+        self._requests.append(self._clock())
+
+    def try_spend(self) -> bool:
+        now = self._clock()
+        self._prune(now)
+        if len(self._retries) + 1 > self.min_per_second * self.ttl + self.ratio * len(self._requests):
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+
+
+class AdaptiveTimeout:
+    """
+    Read timeout following the upstream: `multiplier` times the p99 of the last
+    `window` calls, within [minimum, maximum]. `maximum` applies until `warmup`
+    calls have been observed. Calls cut by the timeout are observed too, at the
+    time they were given, so that an upstream getting slower pushes the
+    estimate up instead of timing out forever; reset() starts over from
+    `maximum` (used when the circuit opens).
+    """
+
+    def __init__(self, minimum: float, maximum: float, multiplier: float, window: int = 200, warmup: int = 20):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.warmup = warmup
+        self._durations: Deque[float] = deque(maxlen=window)
+        self._current = maximum
+        self._stale = False
+
+    def observe(self, duration: float):
+        self._durations.append(duration)
+        self._stale = True
+
+    def reset(self):
+        self._durations.clear()
+        self._current = self.maximum
+        self._stale = False
+
+    def current(self) -> float:
+        if self._stale:
+            self._stale = False
+            if len(self._durations) >= self.warmup:
+                values = sorted(self._durations)
+                p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+                self._current = min(self.maximum, max(self.minimum, p99 * self.multiplier))
+        return self._current
+
+
+# Per-upstream policy
+
+@dataclass
+class ResiliencePolicy:
+    max_concurrent: int
+    max_waiting: int
+    slow_call_seconds: float
+    timeout_min: float
+    timeout_max: float
+    timeout_multiplier: float = 3.0
+    failure_rate_threshold: float = 0.5
+    slow_call_rate_threshold: float = 0.8
+    window: int = 50
+    minimum_calls: int = 20
+    open_seconds: float = 30.0
+    half_open_calls: int = 3
+    retry_attempts: int = 2
+    retry_budget_ratio: float = 0.1
+    retry_min_per_second: float = 1.0
+    retry_backoff: float = 0.05
+    # Send the remaining deadline in X-Request-Timeout; off for third-party APIs.
+    propagate_deadline: bool = True
+
+
+class UpstreamResilience:
+    """
+    State shared by every client of one upstream: it survives the client
+    being rebuilt by the registry.
+    """
+
+    def __init__(self, name: str, policy: ResiliencePolicy):
+        self.name = name
+        self.policy = policy
+        self.bulkhead = Bulkhead(policy.max_concurrent, policy.max_waiting)
+        self.breaker = CircuitBreaker(
+            window=policy.window,
+            minimum_calls=policy.minimum_calls,
+            failure_rate_threshold=policy.failure_rate_threshold,
+            slow_call_seconds=policy.slow_call_seconds,
+            slow_call_rate_threshold=policy.slow_call_rate_threshold,
+            open_seconds=policy.open_seconds,
+            half_open_calls=policy.half_open_calls,
+        )
+        self.retry_budget = RetryBudget(policy.retry_budget_ratio, policy.retry_min_per_second)
+        self.timeout = AdaptiveTimeout(policy.timeout_min, policy.timeout_max, policy.timeout_multiplier)
+        self.rejections: Dict[str, int] = {"circuit_open": 0, "bulkhead_full": 0, "deadline": 0}
+        self.retries = 0
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "failure_rate": round(self.breaker.failure_rate(), 3),
+            "times_opened": self.breaker.opened,
+            "retry_after_seconds": round(self.breaker.retry_after(), 1) if self.breaker.state == CircuitBreaker.OPEN else 0.0,
+            "in_flight": self.bulkhead.in_flight,
+            "waiting": self.bulkhead.waiting,
+            "max_concurrent": self.bulkhead.max_concurrent,
+            "read_timeout_seconds": round(self.timeout.current(), 3),
+            "retries": self.retries,
+            "retry_budget_exhausted": self.retry_budget.exhausted,
+            "rejections": dict(self.rejections),
+        }
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees the bulkhead slot once read or closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """
+    Applies an upstream's resilience policy around the wrapped transport:
+    circuit breaker, bulkhead (held until the response body is closed), read
+    timeout from the adaptive estimate capped by the request deadline, and
+    budgeted retries of idempotent requests on connection errors, timeouts
+    and 502/503/504.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, resilience: UpstreamResilience):
+        self.transport = transport
+        self.resilience = resilience
+
+    def _reject(self, reason: str, error: UpstreamUnavailableError):
+        self.resilience.rejections[reason] += 1
+        raise error
+
+    def _prepare(self, request: httpx.Request, remaining: Optional[float], probe: bool) -> bool:
+        """
+        Set this attempt's timeouts; returns True when the deadline, not the
+        upstream's own estimate, bounds the read timeout. Half-open probes get
+        the maximum read timeout: the estimate may be what kept failing.
+        """
+        timeout = dict(request.extensions.get("timeout") or {})
+        estimate = self.resilience.timeout
+        read = estimate.maximum if probe else estimate.current()
+        caller_read = timeout.get("read")
+        if caller_read is not None:
+            read = min(read, caller_read)
+        bounded_by_deadline = remaining is not None and remaining < read
+        if bounded_by_deadline:
+            read = remaining
+        timeout["read"] = read
+        if remaining is not None:
+            for key in ("connect", "write", "pool"):
+                timeout[key] = remaining if timeout.get(key) is None else min(timeout[key], remaining)
+            if self.resilience.policy.propagate_deadline:
+                request.headers[DEADLINE_HEADER] = f"{remaining:.3f}"
+        request.extensions["timeout"] = timeout
+        return bounded_by_deadline
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        resilience = self.resilience
+        breaker = resilience.breaker
+        name = resilience.name
+        retryable = request.method in IDEMPOTENT_METHODS
+        resilience.retry_budget.record_request()
+        attempt = 0
+        while True:
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                self._reject("deadline", DeadlineExceededError(name))
+            if not breaker.allow():
+                self._reject("circuit_open", CircuitOpenError(name, breaker.retry_after()))
+            probe = breaker.state == CircuitBreaker.HALF_OPEN
+            if not await resilience.bulkhead.acquire(remaining):
+                if probe:
+                    breaker.release_probe()
+                self._reject("bulkhead_full", BulkheadFullError(name))
+            # From here the slot (and the probe) must be given back on every path
+            # but a returned response, whose body takes the slot over.
+            released = False
+            try:
+                bounded_by_deadline = self._prepare(request, remaining_time(), probe)
+                started = time.perf_counter()
+                try:
+                    response = await self.transport.handle_async_request(request)
+                except httpx.TransportError as e:
+                    duration = time.perf_counter() - started
+                    resilience.bulkhead.release()
+                    released = True
+                    if isinstance(e, httpx.TimeoutException) and bounded_by_deadline:
+                        # The caller ran out of time: says nothing about the upstream.
+                        if probe:
+                            breaker.release_probe()
+                        raise
+                    if isinstance(e, httpx.ReadTimeout):
+                        resilience.timeout.observe(duration)
+                    self._record(True, duration)
+                    if not (retryable and await self._may_retry(attempt)):
+                        raise
+                    attempt += 1
+                    continue
+                duration = time.perf_counter() - started
+                failed = response.status_code >= 500
+                self._record(failed, duration)
+                if not failed:
+                    resilience.timeout.observe(duration)
+                if retryable and response.status_code in RETRYABLE_STATUSES and await self._may_retry(attempt):
+                    try:
+                        await response.aclose()
+                    finally:
+                        resilience.bulkhead.release()
+                        released = True
+                    attempt += 1
+                    continue
+                released = True
+                return httpx.Response(
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    stream=_ReleasingStream(response.stream, resilience.bulkhead.release),
+                    extensions=response.extensions,
+                )
+            except BaseException:
+                # Cancellation or an unexpected error from the wrapped transport.
+                if not released:
+                    resilience.bulkhead.release()
+                    if probe:
+                        breaker.release_probe()
+                raise
+
+    def _record(self, failed: bool, duration: float):
+        breaker = self.resilience.breaker
+        opened = breaker.opened
+        breaker.record(failed, duration)
+        if breaker.opened != opened:
+            # Start the next probes from the maximum rather than from an
+            # estimate the upstream no longer meets.
+            self.resilience.timeout.reset()
+
+    async def _may_retry(self, attempt: int) -> bool:
+        policy = self.resilience.policy
+        if attempt >= policy.retry_attempts or not self.resilience.retry_budget.try_spend():
+            return False
+        delay = policy.retry_backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        remaining = remaining_time()
+        if remaining is not None and remaining <= delay:
+            return False
+        await asyncio.sleep(delay)
+        self.resilience.retries += 1
+        return True
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,40 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key: the first caller starts `fn`,
+    later callers await the same task and get its result or its exception.
+
+    The shared task runs independently of its callers, so a cancelled caller
+    does not cancel the work the others are waiting on.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._forget(key, f))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Marks the exception as retrieved even if every caller went away.
+            future.exception()
@@ -1,26 +1,74 @@
 # app/main.py
 import asyncio
+import logging
+import secrets
 import sys
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from datetime import datetime
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from bson import json_util
 from app.services.auth.router import router as auth_router
+from app.services.auth.passwords import password_hasher
+from app.services.auth.oauth_service import google_jwks
 from app.services.contact.router import router as contact_router
+from app.services.contact.outbox import contact_dispatcher
 from app.services.jobs.router import router as jobs_router
-from app.services.jobs.cache import update_job_offers_cache
+from app.services.jobs.cache import load_persisted_job_offers, update_job_offers_cache
+from app.services.jobs.shared import leader_lock, start_shared_job_cache, sync_shared_job_cache
 from app.services.cv_parsing.router import router as cv_parsing_router
+from app.services.cv_parsing.cv_service import upstream_unavailable
+from app.services.cv_parsing.pipeline import cv_pipeline
+from app.services.cv_parsing.parse_cache import prepare_parse_cache
+from app.services.cv_parsing.upload import MULTIPART_OVERHEAD, UploadSizeLimitMiddleware
 from app.config import settings
+from app.core.database import engine, mongo_db, mongo_profiler
+from app.models.mongo.indexes import ensure_indexes_on_startup
+from app.core.http import http_clients
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from app.core.resilience import DeadlineMiddleware, UpstreamUnavailableError
+
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+# httpx journalise chaque requête en INFO ; les appels amont sont suivis par /metrics.
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 scheduler = AsyncIOScheduler()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await update_job_offers_cache()
-    scheduler.add_job(update_job_offers_cache, 'interval', minutes=60)
+    http_clients.open_all()
+    await cv_pipeline.start()
+    await contact_dispatcher.start()
+    if settings.JOBS_SHARED_CACHE:
+        # Un seul worker (leader) interroge l'API des offres ; les autres relisent son snapshot.
+        await start_shared_job_cache()
+        scheduler.add_job(sync_shared_job_cache, 'interval', seconds=settings.JOBS_SHARED_POLL_SECONDS)
+    else:
+        refresh_kwargs = {}
+        if await load_persisted_job_offers():
+            # Snapshot assez récent : on sert tout de suite, la mise à jour part en tâche de fond.
+            refresh_kwargs["next_run_time"] = datetime.now()
+        else:
+            await update_job_offers_cache()
+        scheduler.add_job(update_job_offers_cache, 'interval', minutes=settings.JOBS_REFRESH_INTERVAL_MINUTES, **refresh_kwargs)
+    # Sans déclencheur : exécuté une fois au démarrage, sans bloquer si Mongo est lent.
+    scheduler.add_job(prepare_parse_cache)
+    if settings.MONGO_ENSURE_INDEXES_ON_STARTUP:
+        scheduler.add_job(ensure_indexes_on_startup, args=[mongo_db])
+    # Clés de Google chargées avant la première connexion, puis renouvelées avant expiration.
+    scheduler.add_job(google_jwks.refresh_if_due)
+    scheduler.add_job(google_jwks.refresh_if_due, 'interval', minutes=5)
     scheduler.start()
     yield
     scheduler.shutdown()
+    leader_lock.release()
+    await cv_pipeline.stop()
+    await contact_dispatcher.stop()
+    await http_clients.aclose()
+    await engine.dispose()
+    password_hasher.shutdown()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -41,6 +89,12 @@ origins = [
     "http://127.0.0.1:3000",
 ]
 
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path_prefix=f"{settings.API_V1_STR}/cv_parsing/cv",
+    max_body_size=settings.CV_UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -55,6 +109,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Délai global de chaque requête, partagé par les appels aux services amont.
+app.add_middleware(DeadlineMiddleware, default_seconds=settings.REQUEST_DEADLINE_SECONDS)
+
+if settings.METRICS_ENABLED:
+    # Ajouté en dernier : mesure aussi le temps passé dans les autres middlewares.
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["Authentication"])
 app.include_router(contact_router, prefix=f"{settings.API_V1_STR}/contact", tags=["Contact"])
 app.include_router(jobs_router, prefix=f"{settings.API_V1_STR}/jobs", tags=["Jobs"])
@@ -66,4 +127,42 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailableError):
+    # Même correspondance que les routes CV : 504 si le délai de la requête est épuisé, sinon 503.
+    error = upstream_unavailable(exc)
+    return JSONResponse(status_code=error.status_code, content={"detail": error.detail}, headers=error.headers)
+
+def require_metrics_token(request: Request):
+    """
+    Protège les endpoints d'exploitation par METRICS_TOKEN lorsqu'il est défini.
+    """
+    if not settings.METRICS_TOKEN:
+        return
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not secrets.compare_digest(request.headers.get("authorization", "").encode(), expected):
+        raise HTTPException(status_code=401, detail="Jeton d'accès aux métriques invalide")
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+    def metrics_endpoint():
+        return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+    @app.get("/health/upstreams", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+    def upstreams_health():
+        """
+        État des disjoncteurs, bulkheads, délais adaptatifs et budgets de retry par service amont.
+        """
+        return http_clients.resilience_status()
+
+    if mongo_profiler is not None:
+        @app.get("/health/mongo/slow-queries", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+        def mongo_slow_queries():
+            """
+            Requêtes MongoDB lentes récentes (durée, filtre, plan d'exécution) relevées par le profiler.
+            """
+            # Les filtres contiennent des types BSON (ObjectId, dates) : sérialisés en Extended JSON.
+            report = {**mongo_profiler.stats(), "entries": mongo_profiler.report()}
+            return Response(content=json_util.dumps(report), media_type="application/json")
@@ -1,17 +1,358 @@
+import base64
+import logging
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, AsyncIterator, ClassVar, Iterable, List, NamedTuple, Optional, Sequence
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import BaseModel
-from bson import ObjectId
+from bson import ObjectId, json_util
+from pymongo import ASCENDING, DeleteOne, IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+GET_ALL_MAX_DOCUMENTS = 1000
+# Operations sent per bulk request. The driver further splits a request that
+# exceeds the server's maxWriteBatchSize / maxMessageSizeBytes.
+DEFAULT_BULK_CHUNK_SIZE = 1000
+# Server error codes for an index that exists under the same name or keys with other options.
+INDEX_CONFLICT_CODES = (85, 86)
+
+class TooManyDocumentsError(Exception):
+    """get_all matched more documents than it is allowed to load at once."""
+
+class InvalidPageCursorError(ValueError):
+    pass
+
+class Page(NamedTuple):
+    items: List[dict]
+    next_cursor: Optional[str]  # None on the last page
+
+@dataclass
+class BulkOperationError:
+    index: int  # position of the operation in the caller's input
+    code: Optional[int]
+    message: str
+
+@dataclass
+class BulkResult:
+    inserted: int = 0
+    matched: int = 0
+    modified: int = 0
+    upserted: int = 0
+    deleted: int = 0
+    inserted_ids: List[Any] = field(default_factory=list)
+    errors: List[BulkOperationError] = field(default_factory=list)
+    # Ordered mode stops at the first error: the operations after it were not attempted.
+    stopped_at: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+def _chunks(items: Iterable, size: int):
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode()
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as e:
+        raise InvalidPageCursorError("invalid page cursor") from e
+    if not isinstance(values, list) or len(values) != 2:
+        raise InvalidPageCursorError("invalid page cursor")
+    return values
+
+def _resume_after(sort_key: str, direction: int, last_value, last_id) -> dict:
+    """
+    Filter for the documents after (last_value, last_id) in the keyset order.
+    Range operators only match values of the same BSON type, so null (or
+    missing) values, which sort before everything else, need their own clauses.
+    """
+    comparison = "$gt" if direction == ASCENDING else "$lt"
+    same_value = {sort_key: last_value, "_id": {comparison: last_id}}
+    if last_value is None:
+        if direction == ASCENDING:
+            return {"$or": [same_value, {sort_key: {"$exists": True, "$ne": None}}]}
+        return same_value
+    after = [{sort_key: {comparison: last_value}}, same_value]
+    if direction != ASCENDING:
+        after.append({sort_key: None})
+    return {"$or": after}
+
+def _keyset_projection(projection: Optional[dict], sort_key: str) -> Optional[dict]:
+    # The keyset fields (top-level `sort_key` and `_id`) must come back, or the next cursor cannot be built.
+    if not projection:
+        return projection
+    projection = {key: value for key, value in projection.items() if key != "_id"}
+    if any(projection.values()):
+        if sort_key != "_id":
+            projection[sort_key] = 1
+    else:
+        projection.pop(sort_key, None)
+    return projection or None
 
 class BaseMongoModel(BaseModel):
     id: str | None = None
+    # Indexes of the model's collection, created by ensure_indexes.
+    indexes: ClassVar[List[IndexModel]] = []
+
+    @classmethod
+    def default_collection(cls) -> str:
+        return cls.model_fields["collection_name"].default
 
     @classmethod
-    async def get(cls, db: AsyncIOMotorDatabase, collection: str, query: dict):
-        return await db[collection].find_one(query)
+    async def ensure_indexes(cls, db: AsyncIOMotorDatabase, collection: Optional[str] = None) -> List[str]:
+        """
+        Create the declared indexes; idempotent, existing identical indexes are
+        left alone. A TTL index whose expireAfterSeconds changed is updated in
+        place with collMod; other conflicting definitions are logged and skipped
+        (they need a manual drop). Returns the names of the declared indexes.
+        """
+        collection = collection or cls.default_collection()
+        names = []
+        for index in cls.indexes:
+            document = index.document
+            try:
+                names.extend(await db[collection].create_indexes([index]))
+                continue
+            except OperationFailure as e:
+                if e.code not in INDEX_CONFLICT_CODES:
+                    raise
+                error = e
+            if "expireAfterSeconds" in document:
+                await db.command({
+                    "collMod": collection,
+                    "index": {"keyPattern": document["key"], "expireAfterSeconds": document["expireAfterSeconds"]},
+                })
+                names.append(document["name"])
+            else:
+                logger.warning(f"Index {collection}.{document['name']} already exists with other options: {error}")
+        return names
+
+    @classmethod
+    async def get(cls, db: AsyncIOMotorDatabase, collection: str, query: dict, projection: Optional[dict] = None):
+        return await db[collection].find_one(query, projection)
+
+    @classmethod
+    async def get_all(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        query: dict = {},
+        projection: Optional[dict] = None,
+        max_documents: int = GET_ALL_MAX_DOCUMENTS,
+    ):
+        """
+        Load every matching document into a list. Raises TooManyDocumentsError
+        rather than truncating when more than `max_documents` match; use
+        iter_all or get_page for large results.
+        """
+        documents = await db[collection].find(query, projection).to_list(max_documents + 1)
+        if len(documents) > max_documents:
+            raise TooManyDocumentsError(
+                f"{collection}: more than {max_documents} documents match {query}, use iter_all or get_page"
+            )
+        return documents
+
+    @classmethod
+    async def iter_all(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        query: dict = {},
+        projection: Optional[dict] = None,
+        sort: Optional[list] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream matching documents `batch_size` at a time from the server cursor:
+        memory stays constant whatever the collection size.
+        """
+        cursor = db[collection].find(query, projection, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            async for document in cursor:
+                yield document
+        finally:
+            await cursor.close()
+
+    @classmethod
+    async def get_page(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        query: dict = {},
+        projection: Optional[dict] = None,
+        sort_key: str = "_id",
+        direction: int = ASCENDING,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Page:
+        """
+        Keyset pagination on `sort_key`, tie-broken on `_id`: each page resumes
+        after the last document of the previous one through an index seek, so
+        deep pages cost the same as the first. Pass the returned `next_cursor`
+        back to get the following page. Documents where `sort_key` is null or
+        missing come first in ascending order and last in descending order,
+        as in a plain MongoDB sort.
+        """
+        comparison = "$gt" if direction == ASCENDING else "$lt"
+        filters = [query] if query else []
+        if cursor is not None:
+            last_value, last_id = _decode_cursor(cursor)
+            if sort_key == "_id":
+                filters.append({"_id": {comparison: last_id}})
+            else:
+                filters.append(_resume_after(sort_key, direction, last_value, last_id))
+        sort = [(sort_key, direction)]
+        if sort_key != "_id":
+            sort.append(("_id", direction))
+        mongo_query = {"$and": filters} if len(filters) > 1 else (filters[0] if filters else {})
+        documents = await (
+            db[collection]
+            .find(mongo_query, _keyset_projection(projection, sort_key))
+            .sort(sort)
+            .limit(limit + 1)
+            .to_list(limit + 1)
+        )
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = _encode_cursor([last.get(sort_key) if sort_key != "_id" else None, last["_id"]])
+        return Page(documents, next_cursor)
+
+    @classmethod
+    async def _bulk_write(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        operations: Iterable,
+        ordered: bool,
+        chunk_size: int,
+        positions: Optional[List[int]] = None,
+    ) -> BulkResult:
+        # `positions` maps each operation to its document in the caller's input
+        # when some documents produced no operation.
+        result = BulkResult()
+        offset = 0
+        for chunk in _chunks(operations, chunk_size):
+            try:
+                outcome = await db[collection].bulk_write(chunk, ordered=ordered)
+                details = outcome.bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+            result.inserted += details.get("nInserted", 0)
+            result.matched += details.get("nMatched", 0)
+            result.modified += details.get("nModified", 0)
+            result.upserted += details.get("nUpserted", 0)
+            result.deleted += details.get("nRemoved", 0)
+            for error in details.get("writeErrors", []):
+                index = offset + error["index"]
+                if positions is not None:
+                    index = positions[index]
+                result.errors.append(BulkOperationError(index, error.get("code"), error.get("errmsg", "")))
+            if ordered and result.errors:
+                result.stopped_at = result.errors[0].index
+                break
+            offset += len(chunk)
+        return result
+
+    @classmethod
+    async def bulk_create(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        documents: Iterable[dict],
+        ordered: bool = True,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """
+        insert_many by chunks of `chunk_size`; `documents` may be a generator.
+        Errors are reported per document (index in `documents`), not raised.
+        """
+        result = BulkResult()
+        offset = 0
+        for chunk in _chunks(documents, chunk_size):
+            try:
+                outcome = await db[collection].insert_many(chunk, ordered=ordered)
+                result.inserted += len(outcome.inserted_ids)
+                result.inserted_ids.extend(outcome.inserted_ids)
+            except BulkWriteError as e:
+                failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                for error in e.details.get("writeErrors", []):
+                    result.errors.append(BulkOperationError(offset + error["index"], error.get("code"), error.get("errmsg", "")))
+                result.inserted += e.details.get("nInserted", 0)
+                # insert_many sets _id on each document before sending it.
+                attempted = chunk[:min(failed)] if ordered and failed else chunk
+                result.inserted_ids.extend(
+                    document["_id"] for index, document in enumerate(attempted) if index not in failed
+                )
+                if ordered and failed:
+                    result.stopped_at = offset + min(failed)
+                    break
+            offset += len(chunk)
+        return result
+
+    @classmethod
+    async def bulk_upsert(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        documents: Iterable[dict],
+        key_fields: Sequence[str] = ("_id",),
+        ordered: bool = True,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """
+        One UpdateOne(upsert=True) per document, matched on `key_fields` and
+        applied with $set like `update`. A document missing a key field is
+        reported in the result's errors (code None) and not written; in ordered
+        mode the batch stops there.
+        """
+        positions: List[int] = []
+        invalid: List[BulkOperationError] = []
+
+        def operations():
+            for position, document in enumerate(documents):
+                missing = [name for name in key_fields if name not in document]
+                if missing:
+                    invalid.append(BulkOperationError(position, None, f"missing key field(s): {', '.join(missing)}"))
+                    if ordered:
+                        return
+                    continue
+                positions.append(position)
+                key = {name: document[name] for name in key_fields}
+                fields = {name: value for name, value in document.items() if name != "_id"}
+                yield UpdateOne(key, {"$set": fields}, upsert=True)
+
+        result = await cls._bulk_write(db, collection, operations(), ordered, chunk_size, positions)
+        if invalid and not (ordered and result.errors):
+            result.errors = sorted(result.errors + invalid, key=lambda error: error.index)
+            if ordered:
+                result.stopped_at = result.errors[0].index
+        return result
 
     @classmethod
-    async def get_all(cls, db: AsyncIOMotorDatabase, collection: str, query: dict = {}):
-        return await db[collection].find(query).to_list(1000)
+    async def bulk_delete(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        queries: Iterable[dict],
+        ordered: bool = True,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """
+        One DeleteOne per query, like `delete`.
+        """
+        return await cls._bulk_write(db, collection, (DeleteOne(query) for query in queries), ordered, chunk_size)
 
     @classmethod
     async def create(cls, db: AsyncIOMotorDatabase, collection: str, data: dict):
@@ -19,8 +360,8 @@ class BaseMongoModel(BaseModel):
         return str(result.inserted_id)
 
     @classmethod
-    async def update(cls, db: AsyncIOMotorDatabase, collection: str, query: dict, data: dict):
-        await db[collection].update_one(query, {"$set": data})
+    async def update(cls, db: AsyncIOMotorDatabase, collection: str, query: dict, data: dict, upsert: bool = False):
+        await db[collection].update_one(query, {"$set": data}, upsert=upsert)
 
     @classmethod
     async def delete(cls, db: AsyncIOMotorDatabase, collection: str, query: dict):
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import ClassVar, List
+from pydantic import Field
+from pymongo import IndexModel
+from app.models.mongo.base import BaseMongoModel
+from app.config import settings
+
+class ContactOutboxModel(BaseMongoModel):
+    collection_name: str = settings.MONGO_CONTACT_OUTBOX_COLLECTION
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("status", 1), ("next_attempt_at", 1)]), # dispatcher claims
+        IndexModel([("sent_at", 1)], expireAfterSeconds=settings.CONTACT_OUTBOX_SENT_TTL_DAYS * 24 * 3600),
+    ]
+
+    status: str = "pending" # pending, sending, sent, dead
+    params: dict = Field(default_factory=dict) # email as passed to the provider
+    attempts: int = 0
+    next_attempt_at: datetime | None = None
+    locked_until: datetime | None = None # lease of the dispatcher currently sending it
+    last_error: str | None = None
+    provider_id: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    sent_at: datetime | None = None # BSON date, drives the TTL index
@@ -1,9 +1,14 @@
+from typing import ClassVar, List
 from pydantic import Field
+from pymongo import DESCENDING, IndexModel
 from app.models.mongo.base import BaseMongoModel
 from app.config import settings
 
 class CVModel(BaseMongoModel):
     collection_name: str = settings.MONGO_CV_COLLECTION
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("user_id", 1), ("upload_date", DESCENDING)]), # a user's CVs, latest first
+    ]
 
     user_id: str | None = None
     parsed_data: dict = Field(default_factory=dict)
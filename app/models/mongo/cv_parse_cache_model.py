@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import ClassVar, List
+from pydantic import Field
+from pymongo import IndexModel
+from app.models.mongo.base import BaseMongoModel
+from app.config import settings
+
+class CVParseCacheModel(BaseMongoModel):
+    collection_name: str = settings.MONGO_CV_PARSE_CACHE_COLLECTION
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("last_used_at", 1)], expireAfterSeconds=settings.CV_PARSE_CACHE_TTL_DAYS * 24 * 3600),
+        IndexModel([("parser_version", 1)]),
+    ]
+
+    content_hash: str | None = None # SHA-256 of the uploaded PDF
+    parser_version: str | None = None
+    parsed_data: dict = Field(default_factory=dict)
+    cv_ids: dict[str, str] = Field(default_factory=dict) # user_id -> stored CV id
+    created_at: datetime | None = None
+    last_used_at: datetime | None = None # BSON date, drives the TTL index
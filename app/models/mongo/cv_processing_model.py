@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import ClassVar, List
+from pydantic import Field
+from pymongo import IndexModel
+from app.models.mongo.base import BaseMongoModel
+from app.config import settings
+
+class CVProcessingModel(BaseMongoModel):
+    # _id is the processing_id returned by POST /cv/async
+    collection_name: str = settings.MONGO_CV_PROCESSING_COLLECTION
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("updated_at", 1)], expireAfterSeconds=settings.CV_PIPELINE_RESULT_TTL_SECONDS),
+    ]
+
+    user_id: str | None = None
+    status: str = "queued" # queued, running, succeeded, failed
+    stage: str | None = None # parsing, saving, linking
+    timings: dict[str, float] = Field(default_factory=dict)
+    result: dict | None = None
+    error: dict | None = None
+    created_at: datetime | None = None
+    finished_at: datetime | None = None
+    updated_at: datetime | None = None # BSON date, drives the TTL index
@@ -1,9 +1,15 @@
+from typing import ClassVar, List
 from pydantic import Field
+from pymongo import DESCENDING, IndexModel
 from app.models.mongo.base import BaseMongoModel
 from app.config import settings
 
 class FeedbackModel(BaseMongoModel):
     collection_name: str = settings.MONGO_FEEDBACK_COLLECTION
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("user_id", 1), ("feedback_date", DESCENDING)]), # a user's feedbacks, latest first
+        IndexModel([("interview_id", 1)]),
+    ]
 
     user_id: str | None = None
     interview_id: str | None = None
@@ -0,0 +1,56 @@
+import logging
+from typing import Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.models.mongo.contact_outbox_model import ContactOutboxModel
+from app.models.mongo.cv_model import CVModel
+from app.models.mongo.cv_parse_cache_model import CVParseCacheModel
+from app.models.mongo.cv_processing_model import CVProcessingModel
+from app.models.mongo.feedback_model import FeedbackModel
+from app.models.mongo.interview_history_model import InterviewHistoryModel
+
+logger = logging.getLogger(__name__)
+
+MONGO_MODELS = [CVModel, InterviewHistoryModel, FeedbackModel, CVParseCacheModel, ContactOutboxModel, CVProcessingModel]
+
+async def ensure_all_indexes(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """
+    Create the indexes declared by every Mongo model. Returns {collection: index names}.
+    """
+    created = {}
+    for model in MONGO_MODELS:
+        collection = model.default_collection()
+        created[collection] = await model.ensure_indexes(db, collection)
+    return created
+
+async def ensure_indexes_on_startup(db: AsyncIOMotorDatabase):
+    try:
+        created = await ensure_all_indexes(db)
+        logger.info(f"Index Mongo vérifiés: {created}")
+    except Exception as e:
+        logger.warning(f"Création des index Mongo impossible: {str(e)}")
+
+async def list_indexes(db: AsyncIOMotorDatabase) -> Dict[str, List[dict]]:
+    listed = {}
+    for model in MONGO_MODELS:
+        collection = model.default_collection()
+        listed[collection] = [index async for index in db[collection].list_indexes()]
+    return listed
+
+if __name__ == "__main__":
+    # python -m app.models.mongo.indexes [ensure|list]
+    import argparse
+    import asyncio
+    from app.core.database import mongo_db
+
+    parser = argparse.ArgumentParser(description="Index des collections Mongo déclarés par les modèles")
+    parser.add_argument("action", choices=["ensure", "list"], nargs="?", default="list")
+    args = parser.parse_args()
+    if args.action == "ensure":
+        for collection, names in asyncio.run(ensure_all_indexes(mongo_db)).items():
+            print(f"{collection}: {', '.join(names) or '-'}")
+    else:
+        for collection, indexes in asyncio.run(list_indexes(mongo_db)).items():
+            print(collection)
+            for index in indexes:
+                options = {k: v for k, v in index.items() if k not in ("v", "key", "name")}
+                print(f"  {index['name']}: {dict(index['key'])} {options or ''}")
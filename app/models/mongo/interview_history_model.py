@@ -1,12 +1,106 @@
+from typing import ClassVar, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import Field
+from pymongo import DESCENDING, IndexModel
 from app.models.mongo.base import BaseMongoModel
 from app.config import settings
 
+# $slice needs an explicit count; large enough to mean "to the end".
+_ALL_TURNS = 2**31 - 1
+
 class InterviewHistoryModel(BaseMongoModel):
     collection_name: str = settings.MONGO_INTERVIEW_COLLECTION
+    # Interview lists without the (potentially long) conversations
+    summary_projection: ClassVar[dict] = {"conversation": 0}
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("user_id", 1), ("start_time", DESCENDING)]), # a user's interviews, latest first
+        IndexModel([("cv_id", 1)]),
+    ]
 
     user_id: str | None = None
     cv_id: str | None = None
     conversation: list[dict] = Field(default_factory=list) # List of {role: str, content: str}
     start_time: str | None = None # ISO format string
     end_time: str | None = None # ISO format string
+
+    @classmethod
+    async def append_turns(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        query: dict,
+        turns: List[dict],
+        keep_last: Optional[int] = None,
+    ) -> bool:
+        """
+        Append turns with $push/$each: only the new turns travel, whatever the
+        conversation length. `keep_last` caps the stored conversation ($slice),
+        dropping the oldest turns; positions used by get_turns then shift.
+        Returns False when no interview matches `query`.
+        """
+        push: dict = {"$each": turns}
+        if keep_last is not None:
+            push["$slice"] = -keep_last
+        result = await db[collection].update_one(query, {"$push": {"conversation": push}})
+        return result.matched_count > 0
+
+    @classmethod
+    async def get_turns(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        query: dict,
+        start: int = 0,
+        limit: Optional[int] = None,
+    ) -> Optional[List[dict]]:
+        """
+        Turns [start, start + limit) of the conversation, sliced server-side
+        ($slice projection). A negative `start` counts from the end.
+        Returns None when no interview matches `query`.
+        """
+        if limit is not None and limit <= 0:
+            # $slice rejects a zero limit: only check that the interview exists.
+            document = await db[collection].find_one(query, {"_id": 1})
+            return None if document is None else []
+        document = await db[collection].find_one(
+            query, {"_id": 1, "conversation": {"$slice": [start, _ALL_TURNS if limit is None else limit]}}
+        )
+        if document is None:
+            return None
+        return document.get("conversation", [])
+
+    @classmethod
+    async def get_last_turns(cls, db: AsyncIOMotorDatabase, collection: str, query: dict, count: int) -> Optional[List[dict]]:
+        document = await db[collection].find_one(query, {"_id": 1, "conversation": {"$slice": -count}})
+        if document is None:
+            return None
+        return document.get("conversation", [])
+
+    @classmethod
+    async def get_turns_after(
+        cls,
+        db: AsyncIOMotorDatabase,
+        collection: str,
+        query: dict,
+        index: int,
+        limit: Optional[int] = None,
+    ) -> Optional[List[dict]]:
+        """
+        Turns following position `index`, e.g. what a client holding the first
+        index + 1 turns is missing.
+        """
+        return await cls.get_turns(db, collection, query, start=index + 1, limit=limit)
+
+    @classmethod
+    async def count_turns(cls, db: AsyncIOMotorDatabase, collection: str, query: dict) -> Optional[int]:
+        """
+        Conversation length computed by the server ($size), without transferring it.
+        """
+        pipeline = [
+            {"$match": query},
+            {"$limit": 1},
+            {"$project": {"count": {"$size": {"$ifNull": ["$conversation", []]}}}},
+        ]
+        async for row in db[collection].aggregate(pipeline):
+            return row["count"]
+        return None
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON
+import json
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, case, cast, func, literal, update
+from sqlalchemy.dialects.postgresql import JSONB, insert
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -18,4 +20,68 @@ class User(Base):
     hashed_password = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    last_login = Column(DateTime, nullable=True)
\ No newline at end of file
+    last_login = Column(DateTime, nullable=True)
+
+    @classmethod
+    def merged_auth_providers(cls, provider: str):
+        """
+        Expression SQL : auth_providers augmenté de `provider` s'il n'y figure pas déjà.
+        NULL SQL, null JSON ou toute valeur autre qu'un tableau valent une liste vide.
+        """
+        stored = cast(cls.auth_providers, JSONB)
+        current = case((func.jsonb_typeof(stored) == "array", stored), else_=cast(literal("[]"), JSONB))
+        added = cast(literal(json.dumps([provider])), JSONB)
+        return cast(case((current.contains(added), current), else_=current.concat(added)), JSON)
+
+    @classmethod
+    def oauth_upsert_statement(cls, provider: str, email: str, name: str | None, picture_url: str | None, google_id: str | None = None):
+        """
+        INSERT ... ON CONFLICT (email) DO UPDATE ... RETURNING en une seule requête :
+        crée l'utilisateur ou met à jour son profil et sa dernière connexion, ajoute
+        `provider` à auth_providers côté serveur et ne remplit google_id que s'il était vide.
+        """
+        now = datetime.utcnow()
+        statement = insert(cls).values(
+            email=email,
+            name=name,
+            picture_url=picture_url,
+            google_id=google_id,
+            auth_providers=[provider],
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+            last_login=now,
+            candidate_mongo_id=None,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[cls.email],
+            set_={
+                "google_id": func.coalesce(cls.google_id, statement.excluded.google_id),
+                "name": statement.excluded.name,
+                "picture_url": statement.excluded.picture_url,
+                "auth_providers": cls.merged_auth_providers(provider),
+                "last_login": now,
+                "updated_at": now,
+            },
+        )
+        return statement.returning(cls)
+
+    @classmethod
+    def google_login_update_statement(cls, google_id: str, name: str | None, picture_url: str | None):
+        """
+        Connexion d'un compte Google dont l'email a changé depuis son inscription :
+        l'utilisateur est retrouvé par google_id et son email conservé.
+        """
+        now = datetime.utcnow()
+        return (
+            update(cls)
+            .where(cls.google_id == google_id)
+            .values(
+                name=name,
+                picture_url=picture_url,
+                auth_providers=cls.merged_auth_providers("google"),
+                last_login=now,
+                updated_at=now,
+            )
+            .returning(cls)
+        )
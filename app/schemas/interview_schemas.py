@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 
 class CVParseResponse(BaseModel):
@@ -22,3 +23,18 @@ class InterviewResponse(BaseModel):
 class FeedbackRequest(BaseModel):
     interview_id: str
     feedback_content: dict
+
+class CVProcessingAccepted(BaseModel):
+    processing_id: str
+    status: str
+    status_url: str
+
+class CVProcessingStatus(BaseModel):
+    processing_id: str
+    status: str
+    stage: str | None = None
+    timings_ms: dict[str, float] = Field(default_factory=dict)
+    result: dict | None = None
+    error: dict | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import Optional
 
 class JobOffer(BaseModel):
@@ -18,4 +19,28 @@ class JobOffer(BaseModel):
 
     class Config:
         from_attributes = True
-        populate_by_name = True
\ No newline at end of file
+        populate_by_name = True
+
+class JobOfferSearchResponse(BaseModel):
+    items: list[JobOffer]
+    total: int
+    next_cursor: Optional[str] = None
+    facets: dict[str, dict[str, int]] = Field(default_factory=dict)
+
+
+class JobRefreshStats(BaseModel):
+    started_at: datetime
+    duration_ms: float = 0.0
+    incremental: bool = True
+    not_modified: bool = False
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    total: int = 0
+
+
+class JobCacheStatus(BaseModel):
+    last_update: Optional[datetime] = None
+    offers: int = 0
+    last_refresh: Optional[JobRefreshStats] = None
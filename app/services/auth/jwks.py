@@ -0,0 +1,93 @@
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+from app.core.http import http_clients
+from app.core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+class JWKSCache:
+    """
+    Clés publiques d'un fournisseur OpenID (JWKS), gardées en mémoire selon le
+    Cache-Control de la réponse et rafraîchies en tâche de fond avant expiration.
+
+    Un "kid" inconnu (rotation des clés) déclenche un rafraîchissement immédiat,
+    au plus une fois par `min_refresh_seconds` pour qu'un jeton forgé ne
+    provoque pas un appel au fournisseur à chaque requête.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        client_name: str,
+        default_max_age: float,
+        min_refresh_seconds: float,
+        refresh_margin_seconds: float,
+        clock=time.monotonic,
+    ):
+        self.url = url
+        self.client_name = client_name
+        self.default_max_age = default_max_age
+        self.min_refresh_seconds = min_refresh_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._clock = clock
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._expires_at = 0.0
+        self._fetched_at: Optional[float] = None
+        self._refreshes = SingleFlight()
+        self.fetches = 0
+
+    def _max_age(self, cache_control: str) -> float:
+        match = _MAX_AGE.search(cache_control or "")
+        return float(match.group(1)) if match else self.default_max_age
+
+    async def refresh(self):
+        await self._refreshes.do(self.url, self._fetch)
+
+    async def _fetch(self):
+        client = http_clients.get(self.client_name)
+        response = await client.get(self.url)
+        response.raise_for_status()
+        keys = {key["kid"]: key for key in response.json().get("keys", []) if "kid" in key}
+        now = self._clock()
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + self._max_age(response.headers.get("cache-control"))
+        self.fetches += 1
+
+    async def refresh_if_due(self):
+        """
+        Tâche périodique : rafraîchit les clés avant leur expiration. Une erreur est
+        journalisée et les clés actuelles restent utilisées.
+        """
+        if self._clock() < self._expires_at - self.refresh_margin_seconds:
+            return
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Rafraîchissement des clés JWKS impossible ({self.url}): {str(e)}")
+
+    async def get_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        key = self._keys.get(kid)
+        if key is not None and self._clock() < self._expires_at:
+            return key
+        recently_fetched = self._fetched_at is not None and self._clock() - self._fetched_at < self.min_refresh_seconds
+        if key is None and recently_fetched:
+            return None
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Clés expirées mais fournisseur injoignable : mieux vaut les clés connues que rien.
+            logger.warning(f"Récupération des clés JWKS impossible ({self.url}): {str(e)}")
+            return key
+        return self._keys.get(kid)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._keys),
+            "fetches": self.fetches,
+            "expires_in_seconds": max(0.0, self._expires_at - self._clock()),
+        }
@@ -1,14 +1,24 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from app.models.postgres.user_model import User
 from app.services.auth.service import create_access_token
+from app.services.auth.user_cache import invalidate_user
 from app.config import settings
-from datetime import datetime
+from app.core.http import http_clients
+from app.services.auth.jwks import JWKSCache
+from jose import JWTError, jwt
 import asyncio  
 import httpx
 import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seul algorithme utilisé par Google pour signer ses id_token.
+GOOGLE_ID_TOKEN_ALGORITHMS = ["RS256"]
 
 class AuthProvider(ABC):
     @abstractmethod
@@ -20,16 +30,15 @@ class AuthProvider(ABC):
         pass
 
 import httpx
-import socket
 
 class GoogleAuthProvider(AuthProvider):
-    def __init__(self, client_id: str, client_secret: str, redirect_uri: str):
+    def __init__(self, client_id: str, client_secret: str, redirect_uri: str, jwks: JWKSCache):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
+        self.jwks = jwks
     
     async def get_user_info(self, code: str) -> Dict[str, Any]:
-        token_url = "https://oauth2.googleapis.com/token"
         token_data = {
             "client_id": self.client_id,
             "client_secret": self.client_secret,
@@ -38,34 +47,57 @@ class GoogleAuthProvider(AuthProvider):
             "redirect_uri": self.redirect_uri,
         }
         try:
-            timeout = httpx.Timeout(30.0, connect=10.0)
-            transport = httpx.AsyncHTTPTransport(
-                retries=3,
-                socket_options=[
-                    (socket.SOL_SOCKET, socket.SO_REUSEADDR, 1),
-                ]
-            )
-            
-            async with httpx.AsyncClient(
-                timeout=timeout,
-                transport=transport,
-                headers={
-                    "User-Agent": "AI-Interview-Backend/1.0",
-                    "Accept": "application/json",
-                }
-            ) as client:
-                token_response = await client.post(token_url, data=token_data)
-                token_response.raise_for_status()
-                tokens = token_response.json()
-                user_info_url = f"https://www.googleapis.com/oauth2/v2/userinfo"
+            client = http_clients.get("google")
+            token_response = await client.post(settings.GOOGLE_TOKEN_URL, data=token_data)
+            token_response.raise_for_status()
+            tokens = token_response.json()
+            user_data = await self._user_from_id_token(tokens)
+            if user_data is None:
                 headers = {"Authorization": f"Bearer {tokens['access_token']}"}
-                user_response = await client.get(user_info_url, headers=headers)
+                user_response = await client.get(settings.GOOGLE_USERINFO_URL, headers=headers)
                 user_response.raise_for_status()
                 user_data = user_response.json()
-                return user_data
+            return user_data
                 
         except Exception as e:
             return await self._fallback_with_ip(code)
+
+    async def _user_from_id_token(self, tokens: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Vérifie localement l'id_token (signature via les clés JWKS en cache, audience,
+        émetteur, expiration, at_hash) et en tire les mêmes champs que l'endpoint
+        userinfo. Retourne None s'il faut se rabattre sur userinfo.
+        """
+        id_token = tokens.get("id_token")
+        if not settings.GOOGLE_VERIFY_ID_TOKEN or not id_token:
+            return None
+        try:
+            header = jwt.get_unverified_header(id_token)
+            key = await self.jwks.get_key(header.get("kid"))
+            if key is None:
+                logger.warning(f"Clé de signature de l'id_token inconnue: {header.get('kid')}")
+                return None
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=GOOGLE_ID_TOKEN_ALGORITHMS,
+                audience=self.client_id,
+                issuer=settings.GOOGLE_ID_TOKEN_ISSUERS,
+                access_token=tokens.get("access_token"),
+            )
+        except JWTError as e:
+            logger.warning(f"id_token Google rejeté: {str(e)}")
+            return None
+        if not claims.get("email") or not claims.get("name"):
+            # Portée "email profile" non accordée : userinfo reste la seule source.
+            return None
+        return {
+            "id": claims["sub"],
+            "email": claims["email"],
+            "verified_email": claims.get("email_verified", False),
+            "name": claims["name"],
+            "picture": claims.get("picture"),
+        }
     
     async def _fallback_with_ip(self, code: str) -> Dict[str, Any]:
         token_url = "https://74.125.206.95/token"
@@ -98,13 +130,22 @@ class GoogleAuthProvider(AuthProvider):
     def get_provider_name(self) -> str:
         return "google"
 
+google_jwks = JWKSCache(
+    settings.GOOGLE_JWKS_URL,
+    client_name="google",
+    default_max_age=settings.GOOGLE_JWKS_DEFAULT_MAX_AGE_SECONDS,
+    min_refresh_seconds=settings.GOOGLE_JWKS_MIN_REFRESH_SECONDS,
+    refresh_margin_seconds=settings.GOOGLE_JWKS_REFRESH_MARGIN_SECONDS,
+)
+
 class OAuthService:
     def __init__(self):
         self.providers = {
             "google": GoogleAuthProvider(
                 settings.GOOGLE_CLIENT_ID,
                 settings.GOOGLE_CLIENT_SECRET,
-                settings.GOOGLE_REDIRECT_URI
+                settings.GOOGLE_REDIRECT_URI,
+                google_jwks,
             )
         }
     
@@ -135,45 +176,25 @@ class OAuthService:
         raise ValueError(f"Provider {provider} not implemented")
     
     async def _handle_google_user(self, user_info: Dict, db: AsyncSession) -> User:
-        query = select(User).where(
-            or_(
-                User.google_id == user_info["id"],
-                User.email == user_info["email"]
-            )
+        upsert = User.oauth_upsert_statement(
+            "google",
+            email=user_info["email"],
+            name=user_info["name"],
+            picture_url=user_info.get("picture"),
+            google_id=user_info["id"],
         )
-        result = await db.execute(query)
-        user = result.scalar_one_or_none()
-        
-        if user:
-            if not user.google_id:
-                user.google_id = user_info["id"]
-            if user.auth_providers is None:
-                user.auth_providers = []
-            if "google" not in user.auth_providers:
-                user.auth_providers = user.auth_providers + ["google"]
-            user.last_login = datetime.utcnow()
-            user.updated_at = datetime.utcnow()
-            if not user.name or user.name != user_info["name"]:
-                user.name = user_info["name"]
-            if not user.picture_url or user.picture_url != user_info.get("picture"):
-                user.picture_url = user_info.get("picture")
-        else:
-            user = User(
-                email=user_info["email"],
-                name=user_info["name"],
-                picture_url=user_info.get("picture"),
-                google_id=user_info["id"],
-                auth_providers=["google"],
-                is_active=True,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-                last_login=datetime.utcnow(),
-                candidate_mongo_id=None
-            )
-            db.add(user)
-        
-        await db.commit()
-        await db.refresh(user)
+        try:
+            result = await db.execute(select(User).from_statement(upsert).execution_options(populate_existing=True))
+            user = result.scalar_one()
+            await db.commit()
+        except IntegrityError:
+            # google_id déjà lié à un autre email : l'adresse a changé côté Google.
+            await db.rollback()
+            update = User.google_login_update_statement(user_info["id"], user_info["name"], user_info.get("picture"))
+            result = await db.execute(select(User).from_statement(update).execution_options(populate_existing=True))
+            user = result.scalar_one()
+            await db.commit()
+        invalidate_user(email=user.email, user_id=user.id)
         return user
 
 oauth_service = OAuthService()
\ No newline at end of file
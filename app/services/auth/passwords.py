@@ -0,0 +1,77 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from app.config import settings
+
+T = TypeVar("T")
+
+# Changer PASSWORD_BCRYPT_ROUNDS suffit : les anciens hachages sont refaits à la connexion suivante.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+class PasswordHasher:
+    """
+    Exécute bcrypt (~200 ms par appel, GIL relâché) dans un pool de threads dédié
+    pour ne pas bloquer la boucle d'événements. Au plus `workers` calculs tournent
+    en parallèle et `queue_size` attendent ; au-delà, la demande est refusée en 503.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, queue_size: int):
+        self.context = context
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        if self._slots.locked() and self.waiting >= self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Trop de connexions en cours, veuillez réessayer plus tard.",
+                headers={"Retry-After": "1"},
+            )
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Retourne (valide, nouveau_hachage) ; nouveau_hachage est renseigné quand le
+        hachage stocké utilise des paramètres obsolètes et doit être remplacé.
+        """
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
@@ -1,9 +1,9 @@
 from fastapi import Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt
-from app.config import settings
 from app.core.database import get_db 
 from app.services.auth import service as auth_service
+from app.services.auth.tokens import TokenError, decode_token
+from app.services.auth.user_cache import cache_user, get_cached_user
 
 async def get_current_user(request: Request, db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
@@ -17,14 +17,18 @@ async def get_current_user(request: Request, db: AsyncSession = Depends(get_db))
         raise credentials_exception
 
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-    except JWTError:
+    except TokenError:
         raise credentials_exception
     
+    cached_user = get_cached_user(email)
+    if cached_user is not None:
+        return cached_user
+
     user = await auth_service.get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    return cache_user(user)
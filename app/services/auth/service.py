@@ -1,27 +1,25 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select  
 from app.config import settings
 from app.models.postgres.user_model import User
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
+from app.services.auth.passwords import password_hasher
+from app.services.auth.tokens import encode_token
+from app.services.auth.user_cache import invalidate_user
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
-    if not user:
+    if not user or not user.hashed_password:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_user(email=user.email, user_id=user.id)
     return user
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
@@ -36,6 +34,6 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = encode_token(to_encode)
     return encoded_jwt
 
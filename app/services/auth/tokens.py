@@ -0,0 +1,120 @@
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from jose import JWTError, jwt as jose_jwt
+from app.config import settings
+from app.core.cache import BoundedCache
+from app.core.metrics import register_cache
+
+try:
+    import jwt as pyjwt
+except ImportError:  # PyJWT est optionnel
+    pyjwt = None
+
+class TokenError(Exception):
+    """Jeton invalide, expiré ou mal signé, quel que soit le backend."""
+
+class JWTBackend(ABC):
+    name: str
+
+    @abstractmethod
+    def encode(self, claims: Dict[str, Any], key: str, algorithm: str) -> str:
+        pass
+
+    @abstractmethod
+    def decode(self, token: str, key: str, algorithms: List[str]) -> Dict[str, Any]:
+        pass
+
+class JoseBackend(JWTBackend):
+    name = "jose"
+
+    def encode(self, claims: Dict[str, Any], key: str, algorithm: str) -> str:
+        return jose_jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithms: List[str]) -> Dict[str, Any]:
+        try:
+            return jose_jwt.decode(token, key, algorithms=algorithms)
+        except JWTError as e:
+            raise TokenError(str(e)) from e
+
+class PyJWTBackend(JWTBackend):
+    name = "pyjwt"
+
+    def __init__(self):
+        if pyjwt is None:
+            raise RuntimeError("Le backend JWT 'pyjwt' nécessite le paquet PyJWT")
+
+    def encode(self, claims: Dict[str, Any], key: str, algorithm: str) -> str:
+        return pyjwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithms: List[str]) -> Dict[str, Any]:
+        try:
+            return pyjwt.decode(token, key, algorithms=algorithms)
+        except pyjwt.PyJWTError as e:
+            raise TokenError(str(e)) from e
+
+JWT_BACKENDS = {"jose": JoseBackend, "pyjwt": PyJWTBackend}
+
+def get_jwt_backend(name: Optional[str] = None) -> JWTBackend:
+    name = name or settings.JWT_BACKEND
+    if name not in JWT_BACKENDS:
+        raise ValueError(f"JWT_BACKEND inconnu: {name} (attendu: {', '.join(JWT_BACKENDS)})")
+    return JWT_BACKENDS[name]()
+
+class VerifiedTokenCache:
+    """
+    Revendications des jetons déjà vérifiés, indexées par une empreinte du jeton
+    complet (signature comprise) et conservées jusqu'à leur "exp". Un jeton sans
+    "exp" n'est jamais mis en cache.
+    """
+
+    def __init__(self, backend: JWTBackend, max_entries: int, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.cache = BoundedCache(max_entries=max_entries)
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def decode(self, token: str, key: str, algorithms: List[str]) -> Dict[str, Any]:
+        if not self.enabled:
+            return self.backend.decode(token, key, algorithms)
+        digest = self._digest(token)
+        claims = self.cache.get(digest)
+        if claims is not None:
+            return claims
+        claims = self.backend.decode(token, key, algorithms)
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = exp - time.time()
+            if ttl > 0:
+                self.cache.set(digest, claims, ttl=ttl)
+        return claims
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "backend": self.backend.name}
+
+jwt_backend = get_jwt_backend()
+verified_tokens = VerifiedTokenCache(
+    jwt_backend,
+    max_entries=settings.JWT_CACHE_MAX_ENTRIES,
+    enabled=settings.JWT_CACHE_ENABLED,
+)
+register_cache("jwt", verified_tokens.cache)
+
+def encode_token(claims: Dict[str, Any]) -> str:
+    return jwt_backend.encode(claims, settings.SECRET_KEY, settings.ALGORITHM)
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Vérifie le jeton (ou retrouve sa vérification en cache) ; lève TokenError s'il est invalide.
+    """
+    return verified_tokens.decode(token, settings.SECRET_KEY, [settings.ALGORITHM])
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    return verified_tokens.stats()
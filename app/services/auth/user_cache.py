@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.core.cache import BoundedCache
+from app.core.metrics import register_cache
+from app.models.postgres.user_model import User
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """
+    Copie en lecture seule des colonnes d'un utilisateur utilisées par les routes
+    authentifiées : contrairement à l'objet ORM, elle peut vivre hors de la session.
+    """
+    id: int
+    email: str
+    name: Optional[str] = None
+    picture_url: Optional[str] = None
+    google_id: Optional[str] = None
+    candidate_mongo_id: Optional[str] = None
+    is_active: bool = True
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_orm(cls, user: User) -> "AuthenticatedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            picture_url=user.picture_url,
+            google_id=user.google_id,
+            candidate_mongo_id=user.candidate_mongo_id,
+            is_active=user.is_active if user.is_active is not None else True,
+            created_at=user.created_at,
+        )
+
+# Clés : ("email", email) -> AuthenticatedUser et ("id", user_id) -> email,
+# pour pouvoir invalider depuis les services qui ne connaissent que l'identifiant.
+user_cache = BoundedCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+register_cache("user", user_cache)
+db_round_trips_saved = 0
+
+def get_cached_user(email: str) -> Optional[AuthenticatedUser]:
+    global db_round_trips_saved
+    user = user_cache.get(("email", email))
+    if user is not None:
+        db_round_trips_saved += 1
+    return user
+
+def cache_user(user: User) -> AuthenticatedUser:
+    snapshot = AuthenticatedUser.from_orm(user)
+    user_cache.set(("email", snapshot.email), snapshot)
+    user_cache.set(("id", str(snapshot.id)), snapshot.email)
+    return snapshot
+
+def invalidate_user(email: Optional[str] = None, user_id: Optional[Any] = None):
+    """
+    À appeler après toute modification d'un utilisateur, par email ou par identifiant.
+    """
+    if user_id is not None:
+        cached_email = user_cache.pop(("id", str(user_id)))
+        if cached_email is not None:
+            user_cache.delete(("email", cached_email))
+    if email is not None:
+        user = user_cache.pop(("email", email))
+        if user is not None:
+            user_cache.delete(("id", str(user.id)))
+
+def clear_user_cache():
+    user_cache.clear()
+
+def get_user_cache_stats() -> Dict[str, Any]:
+    return {**user_cache.stats(), "db_round_trips_saved": db_round_trips_saved}
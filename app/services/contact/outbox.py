@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+from pymongo import ASCENDING, ReturnDocument
+from app.config import settings
+from app.core.database import mongo_db
+from app.core.ratelimit import TokenBucket
+from app.models.mongo.contact_outbox_model import ContactOutboxModel
+from app.services.contact.providers import EmailProvider, PermanentEmailError, get_email_provider
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = settings.MONGO_CONTACT_OUTBOX_COLLECTION
+
+class ContactOutboxDispatcher:
+    """
+    Envoie les emails de l'outbox : au plus `concurrency` envois simultanés,
+    `rate_per_second` appels au fournisseur, et des tentatives espacées
+    exponentiellement jusqu'à `max_attempts` avant le passage en "dead".
+
+    Chaque message est réservé par un find_one_and_update atomique avec un bail
+    (locked_until) : plusieurs workers peuvent tourner sans double envoi, et un
+    message réservé par un worker arrêté en plein envoi est repris à l'expiration du bail.
+    """
+
+    def __init__(
+        self,
+        provider: Optional[EmailProvider],
+        concurrency: int,
+        rate_per_second: float,
+        max_attempts: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        poll_seconds: float,
+        lease_seconds: float,
+        collection=None,
+    ):
+        self.provider = provider
+        self.concurrency = concurrency
+        self.rate_per_second = rate_per_second
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self._collection = collection
+        self._limiter: Optional[TokenBucket] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._sending: Set[asyncio.Task] = set()
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+
+    @property
+    def collection(self):
+        return self._collection if self._collection is not None else mongo_db[COLLECTION]
+
+    async def prepare(self):
+        """
+        Index de réservation et index TTL qui purge les messages envoyés.
+        """
+        try:
+            await ContactOutboxModel.ensure_indexes(self.collection.database, self.collection.name)
+        except Exception as e:
+            logger.warning(f"Préparation de l'outbox de contact impossible: {str(e)}")
+
+    async def start(self):
+        if self.provider is None:
+            self.provider = get_email_provider()
+        self._limiter = TokenBucket(self.rate_per_second, burst=self.rate_per_second)
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        # Les envois en cours sont abandonnés ; leur bail expirera et un autre worker les reprendra.
+        for task in list(self._sending):
+            task.cancel()
+        await asyncio.gather(*self._sending, return_exceptions=True)
+
+    async def enqueue(self, params: Dict[str, Any]) -> str:
+        """
+        Enregistre l'email dans l'outbox Mongo ; il sera envoyé en tâche de fond.
+        """
+        now = datetime.utcnow()
+        result = await self.collection.insert_one({
+            "status": "pending",
+            "params": params,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "locked_until": None,
+            "last_error": None,
+            "provider_id": None,
+            "created_at": now,
+            "updated_at": now,
+        })
+        self.wake()
+        return str(result.inserted_id)
+
+    def wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempts - 1))
+        # Jitter : évite que des échecs simultanés soient retentés tous ensemble.
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    {"status": "sending", "locked_until": {"$lte": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": "sending",
+                    "locked_until": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _send(self, message: Dict[str, Any]):
+        await self._limiter.acquire()
+        try:
+            provider_id = await self.provider.send(message["params"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._failed(message, e)
+            return
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": message["_id"]},
+            {"$set": {
+                "status": "sent",
+                "provider_id": provider_id,
+                "locked_until": None,
+                "last_error": None,
+                "sent_at": now,
+                "updated_at": now,
+            }},
+        )
+        self.sent += 1
+
+    async def _failed(self, message: Dict[str, Any], error: Exception):
+        attempts = message["attempts"]
+        now = datetime.utcnow()
+        update = {"locked_until": None, "last_error": str(error), "updated_at": now}
+        if isinstance(error, PermanentEmailError) or attempts >= self.max_attempts:
+            update["status"] = "dead"
+            self.dead += 1
+            logger.error(f"Email de contact {message['_id']} abandonné après {attempts} tentative(s): {error}")
+        else:
+            update["status"] = "pending"
+            update["next_attempt_at"] = now + timedelta(seconds=self.backoff(attempts))
+            self.retried += 1
+            logger.warning(f"Échec d'envoi de l'email de contact {message['_id']} (tentative {attempts}): {error}")
+        await self.collection.update_one({"_id": message["_id"]}, {"$set": update})
+
+    async def dispatch_once(self) -> int:
+        """
+        Réserve autant de messages dus que de places libres et lance leur envoi.
+        Retourne le nombre de messages lancés.
+        """
+        started = 0
+        while len(self._sending) < self.concurrency:
+            message = await self._claim()
+            if message is None:
+                break
+            task = asyncio.create_task(self._send(message))
+            self._sending.add(task)
+            task.add_done_callback(self._sent)
+            started += 1
+        return started
+
+    def _sent(self, task: asyncio.Task):
+        self._sending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Erreur inattendue du dispatcher de l'outbox: {task.exception()}")
+        # Une place s'est libérée.
+        self.wake()
+
+    async def drain(self):
+        """
+        Envoie tout ce qui est dû puis attend la fin des envois (outil de test et d'administration).
+        """
+        while await self.dispatch_once() or self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    async def _run(self):
+        # Dans la boucle plutôt qu'au démarrage : un Mongo lent ne retarde pas le lancement de l'API.
+        await self.prepare()
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.dispatch_once()
+            except Exception as e:
+                logger.warning(f"Outbox de contact indisponible: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self.collection.find({"status": "dead"}).sort("updated_at", ASCENDING).to_list(limit)
+
+    async def requeue_dead(self) -> int:
+        """
+        Remet les messages abandonnés dans la file, par exemple après correction de la configuration.
+        """
+        now = datetime.utcnow()
+        result = await self.collection.update_many(
+            {"status": "dead"},
+            {"$set": {"status": "pending", "attempts": 0, "next_attempt_at": now, "updated_at": now}},
+        )
+        self.wake()
+        return result.modified_count
+
+    async def stats(self) -> Dict[str, Any]:
+        counts = {status: 0 for status in ("pending", "sending", "sent", "dead")}
+        async for row in self.collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return {**counts, "in_flight": len(self._sending), "sent_total": self.sent, "retried_total": self.retried, "dead_total": self.dead}
+
+contact_dispatcher = ContactOutboxDispatcher(
+    provider=None,
+    concurrency=settings.CONTACT_OUTBOX_CONCURRENCY,
+    rate_per_second=settings.CONTACT_OUTBOX_RATE_PER_SECOND,
+    max_attempts=settings.CONTACT_OUTBOX_MAX_ATTEMPTS,
+    backoff_base_seconds=settings.CONTACT_OUTBOX_BACKOFF_BASE_SECONDS,
+    backoff_max_seconds=settings.CONTACT_OUTBOX_BACKOFF_MAX_SECONDS,
+    poll_seconds=settings.CONTACT_OUTBOX_POLL_SECONDS,
+    lease_seconds=settings.CONTACT_OUTBOX_LEASE_SECONDS,
+)
@@ -0,0 +1,66 @@
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+import resend
+from resend.exceptions import MissingRequiredFieldsError, ValidationError
+from app.config import settings
+from app.core.metrics import record_upstream
+
+class PermanentEmailError(Exception):
+    """Refus définitif du fournisseur : inutile de réessayer, le message part en dead-letter."""
+
+class EmailProvider(ABC):
+    @abstractmethod
+    async def send(self, params: Dict[str, Any]) -> str:
+        """Envoie l'email et retourne l'identifiant attribué par le fournisseur."""
+        pass
+
+class ResendEmailProvider(EmailProvider):
+    def __init__(self, api_key: str):
+        resend.api_key = api_key
+
+    async def send(self, params: Dict[str, Any]) -> str:
+        # Le SDK Resend est synchrone : l'appel HTTP part dans un thread.
+        started = time.perf_counter()
+        try:
+            email = await asyncio.to_thread(resend.Emails.send, params)
+        except (ValidationError, MissingRequiredFieldsError) as e:
+            record_upstream("resend", type(e).__name__, time.perf_counter() - started)
+            raise PermanentEmailError(str(e)) from e
+        except Exception as e:
+            record_upstream("resend", type(e).__name__, time.perf_counter() - started)
+            raise
+        record_upstream("resend", "sent", time.perf_counter() - started)
+        return email.get("id")
+
+class FakeEmailProvider(EmailProvider):
+    """
+    Fournisseur local pour le développement et les tests : garde les emails en
+    mémoire, avec une latence et des échecs simulés optionnels.
+    """
+
+    def __init__(self, latency: float = 0.0, failures: int = 0):
+        self.latency = latency
+        self.failures = failures
+        self.sent: List[Dict[str, Any]] = []
+        self.calls = 0
+
+    async def send(self, params: Dict[str, Any]) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("Échec simulé du fournisseur d'email")
+        self.sent.append(params)
+        return f"fake-{uuid.uuid4().hex}"
+
+def get_email_provider(name: str | None = None) -> EmailProvider:
+    name = name or settings.CONTACT_EMAIL_PROVIDER
+    if name == "resend":
+        return ResendEmailProvider(settings.RESEND_API_KEY)
+    if name == "fake":
+        return FakeEmailProvider()
+    raise ValueError(f"CONTACT_EMAIL_PROVIDER inconnu: {name} (attendu: resend, fake)")
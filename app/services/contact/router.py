@@ -1,13 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, status
 from app.schemas.contact_schemas import ContactForm
 from app.services.contact import service
 
 router = APIRouter()
 
-@router.post("", response_model=dict)
+@router.post("", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
 async def send_contact_form(form_data: ContactForm):
     try:
-        await service.send_contact_email(form_data)
-        return {"message": "Contact form submitted successfully"}
+        message_id = await service.send_contact_email(form_data)
+        return {"message": "Contact form submitted successfully", "id": message_id}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
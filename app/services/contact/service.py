@@ -1,10 +1,9 @@
-import resend
+from typing import Any, Dict
 from app.config import settings
 from app.schemas.contact_schemas import ContactForm
+from app.services.contact.outbox import contact_dispatcher
 
-resend.api_key = settings.RESEND_API_KEY 
-
-async def send_contact_email(form_data: ContactForm):
+def build_contact_email(form_data: ContactForm) -> Dict[str, Any]:
     receiver_email = settings.GMAIL_USER 
     sender_email = settings.SENDER_EMAIL
     
@@ -17,17 +16,16 @@ async def send_contact_email(form_data: ContactForm):
     {form_data.message}
     """
 
-    params = {
+    return {
       "from": f"AIrh Contact <{sender_email}>", 
       "to": [receiver_email],
       "subject": subject,
       "text": body,
     }
 
-    try:
-        email = resend.Emails.send(params)
-        return {"message": "Email sent successfully via Resend", "resend_id": email.get("id")}
-        
-    except Exception as e:
-        print(f"RESEND ERROR: {e}") 
-        raise Exception(f"Failed to send email via Resend: {e}")
\ No newline at end of file
+async def send_contact_email(form_data: ContactForm) -> str:
+    """
+    Place l'email dans l'outbox ; l'envoi via le fournisseur se fait en tâche de fond.
+    Retourne l'identifiant du message dans l'outbox.
+    """
+    return await contact_dispatcher.enqueue(build_contact_email(form_data))
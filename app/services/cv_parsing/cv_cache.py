@@ -1,18 +1,23 @@
 from typing import Dict, Any, Optional
-import asyncio
+from app.config import settings
+from app.core.cache import BoundedCache
+from app.core.metrics import register_cache
 
-cached_cv_data: Dict[str, Dict[str, Any]] = {}
-cache_lock = asyncio.Lock()
+cv_cache = BoundedCache(
+    max_entries=settings.CV_CACHE_MAX_ENTRIES,
+    max_bytes=settings.CV_CACHE_MAX_BYTES,
+    ttl=settings.CV_CACHE_TTL_SECONDS,
+)
+register_cache("cv", cv_cache)
 
 async def get_cv_from_cache(user_id: str) -> Optional[Dict[str, Any]]:
-    async with cache_lock:
-        return cached_cv_data.get(user_id)
+    return cv_cache.get(user_id)
 
 async def set_cv_in_cache(user_id: str, cv_data: Dict[str, Any]):
-    async with cache_lock:
-        cached_cv_data[user_id] = cv_data
+    cv_cache.set(user_id, cv_data)
 
 async def clear_cv_cache(user_id: str):
-    async with cache_lock:
-        if user_id in cached_cv_data:
-            del cached_cv_data[user_id]
\ No newline at end of file
+    cv_cache.delete(user_id)
+
+def get_cv_cache_stats() -> Dict[str, Any]:
+    return cv_cache.stats()
@@ -1,30 +1,80 @@
+import math
 import httpx
 from fastapi import UploadFile, HTTPException
 from typing import Dict, Any, Optional
 from app.config import settings
 from datetime import datetime
 import logging
+from app.core.http import http_clients
+from app.core.resilience import DeadlineExceededError, UpstreamUnavailableError
+from app.core.singleflight import SingleFlight
+from app.services.auth.user_cache import invalidate_user
+from app.services.cv_parsing import parse_cache
 from app.services.cv_parsing.cv_cache import get_cv_from_cache, set_cv_in_cache, clear_cv_cache
+from app.services.cv_parsing.parse_cache import ParseCacheEntry, hash_upload
+from app.services.cv_parsing.upload import stream_multipart_file, validate_pdf_upload
 
 logger = logging.getLogger(__name__)
 
+cv_fetches = SingleFlight()
+
+def upstream_unavailable(e: UpstreamUnavailableError, service: Optional[str] = None) -> HTTPException:
+    """
+    Appel refusé sans atteindre le service amont (circuit ouvert, trop d'appels
+    en cours ou délai de la requête épuisé) : 503 avec Retry-After, ou 504.
+    Sans `service`, message générique (gestionnaire global de l'application).
+    """
+    logger.warning(f"{service or 'Service amont'} indisponible : {e}")
+    if isinstance(e, DeadlineExceededError):
+        target = service or "un service amont"
+        return HTTPException(status_code=504, detail=f"Délai dépassé avant l'appel à {target}.")
+    return HTTPException(
+        status_code=503,
+        detail=f"{service or 'Service amont'} momentanément indisponible, veuillez réessayer.",
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+
 async def process_cv_upload(user_id: str, file: UploadFile) -> Dict[str, Any]:
-    if file.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="PDF file required")
-    
-    file_content = await file.read()
+    file_size = await validate_pdf_upload(file)
+    cached = await parse_or_reuse(user_id, file, file_size)
+    cv_id = await save_or_reuse(user_id, cached)
+    return await link_cv_to_user(user_id, cv_id)
+
+async def parse_or_reuse(user_id: str, file: UploadFile, file_size: int) -> ParseCacheEntry:
+    """
+    Un PDF identique (même empreinte SHA-256, même version du parseur) n'est pas re-parsé.
+    """
+    content_hash = await hash_upload(file)
+    cached = await parse_cache.lookup(content_hash, user_id)
+    if cached.parsed_data is not None:
+        logger.info(f"Étape 1 : CV déjà analysé (empreinte {content_hash[:12]}), parsing ignoré.")
+        return cached
+    cached.parsed_data = await parse_cv_file(file, file_size)
+    await parse_cache.remember_parse(content_hash, cached.parsed_data)
+    return cached
+
+async def save_or_reuse(user_id: str, cached: ParseCacheEntry) -> str:
+    if cached.cv_id:
+        logger.info(f"Étape 2 : CV déjà sauvegardé pour cet utilisateur ({cached.cv_id}), sauvegarde ignorée.")
+        return cached.cv_id
+    cached.cv_id = await save_parsed_cv(user_id, cached.parsed_data)
+    await parse_cache.remember_cv(cached.content_hash, user_id, cached.cv_id)
+    return cached.cv_id
+
+async def parse_cv_file(file: UploadFile, file_size: int) -> Dict[str, Any]:
     logger.info(f"Étape 1 : Lecture du fichier et appel de l'API de parsing du CV.")
     
     try:
         cv_parsing_url = f"{settings.CV_API_URL}/parse-cv/"
-        files = {'file': (file.filename, file_content, file.content_type)}
-        timeout = httpx.Timeout(None, connect=10.0)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            logger.info(f"Appel de l'API de parsing: {cv_parsing_url}")
-            response = await client.post(cv_parsing_url, files=files)
-            response.raise_for_status()
-            parsed_cv_data = response.json()
-            logger.info("Parsing CV réussi")
+        headers, body = stream_multipart_file(file, file_size)
+        # Délai de lecture du client cv_api, ajusté à la latence observée et au délai de la requête.
+        client = http_clients.get("cv_api")
+        logger.info(f"Appel de l'API de parsing: {cv_parsing_url}")
+        response = await client.post(cv_parsing_url, content=body, headers=headers)
+        response.raise_for_status()
+        parsed_cv_data = response.json()
+        logger.info("Parsing CV réussi")
+        return parsed_cv_data
             
     except httpx.TimeoutException:
         logger.error("Timeout lors de la lecture de la réponse de l'API de parsing du CV.")
@@ -32,10 +82,13 @@ async def process_cv_upload(user_id: str, file: UploadFile) -> Dict[str, Any]:
     except httpx.HTTPStatusError as e:
         logger.error(f"Erreur HTTP de l'API de parsing: {e.response.status_code} - {e.response.text}")
         raise HTTPException(status_code=e.response.status_code, detail=f"Erreur de l'API de parsing de CV: {e.response.text}")
+    except UpstreamUnavailableError as e:
+        raise upstream_unavailable(e, "L'API de parsing de CV")
     except Exception as e:
         logger.error(f"Erreur lors de l'appel de l'API de parsing: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Échec de la communication avec l'API de parsing de CV: {str(e)}")
 
+async def save_parsed_cv(user_id: str, parsed_cv_data: Dict[str, Any]) -> str:
     try:
         logger.info("Étape 2 : Sauvegarde du CV dans la base de données.")
         data_access_url = f"{settings.DATA_ACCESS_API_URL}/api/v1/cvs"
@@ -45,69 +98,81 @@ async def process_cv_upload(user_id: str, file: UploadFile) -> Dict[str, Any]:
             "upload_date": datetime.utcnow().isoformat()
         }
         
-        async with httpx.AsyncClient(timeout=settings.API_TIMEOUT) as client:
-            response = await client.post(data_access_url, json=cv_payload)
-            response.raise_for_status()
-            cv_db_entry = response.json()
-            cv_id = cv_db_entry.get("_id")
-            if not cv_id:
-                raise ValueError("L'ID du document CV n'a pas été renvoyé par l'API de données.")
-            logger.info(f"CV sauvegardé avec l'ID: {cv_id}")
+        client = http_clients.get("data_access")
+        response = await client.post(data_access_url, json=cv_payload)
+        response.raise_for_status()
+        cv_db_entry = response.json()
+        cv_id = cv_db_entry.get("_id")
+        if not cv_id:
+            raise ValueError("L'ID du document CV n'a pas été renvoyé par l'API de données.")
+        logger.info(f"CV sauvegardé avec l'ID: {cv_id}")
+        return cv_id
             
     except httpx.HTTPStatusError as e:
         logger.error(f"Erreur HTTP lors de la sauvegarde: {e.response.status_code} - {e.response.text}")
         raise HTTPException(status_code=e.response.status_code, detail=f"Erreur de l'API de données (stockage du CV): {e.response.text}")
+    except UpstreamUnavailableError as e:
+        raise upstream_unavailable(e, "L'API de données")
     except Exception as e:
         logger.error(f"Erreur lors de la sauvegarde: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Échec de la sauvegarde du CV dans la base de données: {str(e)}")
-    
+
+async def link_cv_to_user(user_id: str, cv_id: str) -> Dict[str, Any]:
     try:
         logger.info("Étape 3 : Mise à jour du profil utilisateur.")
         user_update_url = f"{settings.DATA_ACCESS_API_URL}/api/v1/users/{user_id}"
         user_update_payload = {"candidate_mongo_id": cv_id}
         
-        async with httpx.AsyncClient(timeout=settings.API_TIMEOUT) as client:
-            response = await client.put(user_update_url, json=user_update_payload)
-            response.raise_for_status()
-            updated_user = response.json()
-            logger.info("Profil utilisateur mis à jour avec succès")
-            await clear_cv_cache(user_id)
-            return updated_user
+        client = http_clients.get("data_access")
+        response = await client.put(user_update_url, json=user_update_payload)
+        response.raise_for_status()
+        updated_user = response.json()
+        logger.info("Profil utilisateur mis à jour avec succès")
+        await clear_cv_cache(user_id)
+        invalidate_user(user_id=user_id)
+        return updated_user
             
     except httpx.HTTPStatusError as e:
         logger.error(f"Erreur HTTP lors de la mise à jour utilisateur: {e.response.status_code} - {e.response.text}")
         raise HTTPException(status_code=e.response.status_code, detail=f"Erreur de l'API de données (mise à jour de l'utilisateur): {e.response.text}")
+    except UpstreamUnavailableError as e:
+        raise upstream_unavailable(e, "L'API de données")
     except Exception as e:
         logger.error(f"Erreur lors de la mise à jour utilisateur: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Échec de la mise à jour du profil utilisateur: {str(e)}") 
     
 async def get_user_cv_data(user_id: str) -> Optional[Dict[str, Any]]:
+    cv_data_from_cache = await get_cv_from_cache(user_id)
+    if cv_data_from_cache:
+        logger.info(f"CV data retrieved from cache for user {user_id}")
+        return cv_data_from_cache
+    # Cache froid : les lectures concurrentes d'un même utilisateur partagent un seul appel.
+    return await cv_fetches.do(user_id, lambda: _fetch_user_cv_data(user_id))
+
+async def _fetch_user_cv_data(user_id: str) -> Optional[Dict[str, Any]]:
     try:
-        cv_data_from_cache = await get_cv_from_cache(user_id)
-        if cv_data_from_cache:
-            logger.info(f"CV data retrieved from cache for user {user_id}")
-            return cv_data_from_cache
         user_info_url = f"{settings.DATA_ACCESS_API_URL}/api/v1/users/{user_id}"
-        async with httpx.AsyncClient(timeout=settings.API_TIMEOUT) as client:
-            user_response = await client.get(user_info_url)
-            user_response.raise_for_status()
-            user_data = user_response.json()
-            candidate_mongo_id = user_data.get("candidate_mongo_id")
+        client = http_clients.get("data_access")
+        user_response = await client.get(user_info_url)
+        user_response.raise_for_status()
+        user_data = user_response.json()
+        candidate_mongo_id = user_data.get("candidate_mongo_id")
 
         if not candidate_mongo_id:
             return None 
 
         cv_data_url = f"{settings.DATA_ACCESS_API_URL}/api/v1/cvs/{candidate_mongo_id}"
-        async with httpx.AsyncClient(timeout=settings.API_TIMEOUT) as client:
-            cv_response = await client.get(cv_data_url)
-            cv_response.raise_for_status()
-            cv_data = cv_response.json()
-            await set_cv_in_cache(user_id, cv_data)
-            return cv_data
+        cv_response = await client.get(cv_data_url)
+        cv_response.raise_for_status()
+        cv_data = cv_response.json()
+        await set_cv_in_cache(user_id, cv_data)
+        return cv_data
 
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
             return None
         raise HTTPException(status_code=e.response.status_code, detail=f"Erreur de l'API de données: {e.response.text}")
+    except UpstreamUnavailableError as e:
+        raise upstream_unavailable(e, "L'API de données")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Échec de la récupération des données du CV: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,109 @@
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+from fastapi import UploadFile
+from app.config import settings
+from app.core.database import mongo_db
+from app.models.mongo.cv_parse_cache_model import CVParseCacheModel
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = settings.MONGO_CV_PARSE_CACHE_COLLECTION
+
+@dataclass
+class ParseCacheEntry:
+    content_hash: str
+    parsed_data: Optional[Dict[str, Any]] = None
+    cv_id: Optional[str] = None
+
+def _key(content_hash: str, parser_version: Optional[str] = None) -> str:
+    return f"{parser_version or settings.CV_PARSER_VERSION}:{content_hash}"
+
+async def hash_upload(file: UploadFile) -> str:
+    """
+    SHA-256 du fichier, lu par morceaux ; le fichier est rembobiné ensuite.
+    """
+    digest = hashlib.sha256()
+    await file.seek(0)
+    while chunk := await file.read(settings.CV_UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest()
+
+async def lookup(content_hash: str, user_id: str) -> ParseCacheEntry:
+    """
+    Résultat de parsing déjà connu pour ce contenu, et CV déjà stocké pour cet utilisateur.
+    Une erreur Mongo est traitée comme un défaut de cache.
+    """
+    entry = ParseCacheEntry(content_hash=content_hash)
+    if not settings.CV_PARSE_CACHE_ENABLED:
+        return entry
+    try:
+        document = await CVParseCacheModel.get(mongo_db, COLLECTION, {"_id": _key(content_hash)})
+        if document is None:
+            return entry
+        entry.parsed_data = document.get("parsed_data")
+        entry.cv_id = (document.get("cv_ids") or {}).get(user_id)
+        await CVParseCacheModel.update(mongo_db, COLLECTION, {"_id": _key(content_hash)}, {"last_used_at": datetime.utcnow()})
+    except Exception as e:
+        logger.warning(f"Cache de parsing indisponible (lecture): {str(e)}")
+    return entry
+
+async def remember_parse(content_hash: str, parsed_data: Dict[str, Any]):
+    if not settings.CV_PARSE_CACHE_ENABLED:
+        return
+    now = datetime.utcnow()
+    try:
+        await mongo_db[COLLECTION].update_one(
+            {"_id": _key(content_hash)},
+            {
+                "$set": {"parsed_data": parsed_data, "last_used_at": now},
+                "$setOnInsert": {
+                    "content_hash": content_hash,
+                    "parser_version": settings.CV_PARSER_VERSION,
+                    "cv_ids": {},
+                    "created_at": now,
+                },
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning(f"Cache de parsing indisponible (écriture): {str(e)}")
+
+async def remember_cv(content_hash: str, user_id: str, cv_id: str):
+    if not settings.CV_PARSE_CACHE_ENABLED:
+        return
+    try:
+        await CVParseCacheModel.update(
+            mongo_db, COLLECTION, {"_id": _key(content_hash)}, {f"cv_ids.{user_id}": cv_id}
+        )
+    except Exception as e:
+        logger.warning(f"Cache de parsing indisponible (écriture): {str(e)}")
+
+async def invalidate(parser_version: Optional[str] = None) -> int:
+    """
+    Supprime les entrées d'une version du parseur donnée, ou par défaut de toutes
+    les versions autres que CV_PARSER_VERSION. Retourne le nombre d'entrées supprimées.
+    """
+    if parser_version is None:
+        query = {"parser_version": {"$ne": settings.CV_PARSER_VERSION}}
+    else:
+        query = {"parser_version": parser_version}
+    result = await mongo_db[COLLECTION].delete_many(query)
+    return result.deleted_count
+
+async def prepare_parse_cache():
+    """
+    Index TTL (borne la taille du cache) et purge des entrées d'anciennes versions du parseur.
+    """
+    if not settings.CV_PARSE_CACHE_ENABLED:
+        return
+    try:
+        await CVParseCacheModel.ensure_indexes(mongo_db, COLLECTION)
+        deleted = await invalidate()
+        if deleted:
+            logger.info(f"Cache de parsing : {deleted} entrées d'anciennes versions du parseur supprimées")
+    except Exception as e:
+        logger.warning(f"Préparation du cache de parsing impossible: {str(e)}")
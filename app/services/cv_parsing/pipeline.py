@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from app.config import settings
+from app.core.database import mongo_db
+from app.services.cv_parsing import cv_service
+from app.services.cv_parsing.upload import validate_pdf_upload
+
+logger = logging.getLogger(__name__)
+
+# Au-delà, la copie du fichier en attente de traitement passe de la mémoire au disque.
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+COLLECTION = settings.MONGO_CV_PROCESSING_COLLECTION
+
+STOPPED_ERROR = {"status_code": 503, "detail": "Traitement interrompu par l'arrêt du service."}
+
+@dataclass
+class CVProcessingJob:
+    id: str
+    user_id: str
+    file: Optional[UploadFile] = field(default=None, repr=False)
+    file_size: int = 0
+    status: str = "queued"  # queued, running, succeeded, failed
+    stage: Optional[str] = None  # parsing, saving, linking
+    timings: Dict[str, float] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+async def _spool_upload(file: UploadFile) -> UploadFile:
+    """
+    Copie le fichier reçu : l'UploadFile de la requête est fermé dès la réponse 202 envoyée.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    size = 0
+    while chunk := await file.read(settings.CV_UPLOAD_CHUNK_SIZE):
+        spooled.write(chunk)
+        size += len(chunk)
+    spooled.seek(0)
+    return UploadFile(
+        file=spooled,
+        size=size,
+        filename=file.filename,
+        headers=Headers({"content-type": "application/pdf"}),
+    )
+
+def _job_from_document(document: Dict[str, Any]) -> CVProcessingJob:
+    return CVProcessingJob(
+        id=document["_id"],
+        user_id=document["user_id"],
+        status=document["status"],
+        stage=document.get("stage"),
+        timings=document.get("timings") or {},
+        result=document.get("result"),
+        error=document.get("error"),
+        created_at=document["created_at"],
+        finished_at=document.get("finished_at"),
+    )
+
+class CVProcessingPipeline:
+    """
+    File d'attente bornée et pool de workers pour les trois étapes de
+    process_cv_upload (parsing, sauvegarde, liaison au profil).
+
+    Le fichier reste dans le process qui a reçu l'envoi, mais l'état de chaque
+    traitement est enregistré dans Mongo (CVProcessingModel, purgé par index TTL
+    CV_PIPELINE_RESULT_TTL_SECONDS après sa dernière mise à jour) : le suivi
+    répond depuis n'importe quel worker et survit à un redémarrage.
+    """
+
+    def __init__(self, concurrency: int, queue_size: int, collection=None):
+        self.concurrency = concurrency
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._collection = collection
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def collection(self):
+        return self._collection if self._collection is not None else mongo_db[COLLECTION]
+
+    async def _save(self, job: CVProcessingJob, *fields: str):
+        """
+        Enregistre les champs `fields` du traitement. Un échec d'écriture est
+        journalisé sans interrompre le traitement.
+        """
+        values = {name: getattr(job, name) for name in fields}
+        try:
+            await self.collection.update_one({"_id": job.id}, {"$set": {**values, "updated_at": datetime.utcnow()}})
+        except Exception as e:
+            logger.warning(f"Enregistrement de l'état du traitement {job.id} impossible: {str(e)}")
+
+    async def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # Les CV encore en attente ne seront pas traités : libère leur copie (parfois sur disque).
+        while not self.queue.empty():
+            job = self.queue.get_nowait()
+            job.status = "failed"
+            job.error = STOPPED_ERROR
+            job.finished_at = datetime.utcnow()
+            await job.file.close()
+            job.file = None
+            self.queue.task_done()
+            await self._save(job, "status", "error", "finished_at")
+
+    async def submit(self, user_id: str, file: UploadFile) -> CVProcessingJob:
+        await validate_pdf_upload(file)
+        if self.queue.full():
+            raise HTTPException(status_code=503, detail="Trop de CV en cours de traitement, veuillez réessayer plus tard.")
+        spooled = await _spool_upload(file)
+        job = CVProcessingJob(id=uuid.uuid4().hex, user_id=user_id, file=spooled, file_size=spooled.size)
+        try:
+            await self.collection.insert_one({
+                "_id": job.id,
+                "user_id": job.user_id,
+                "status": job.status,
+                "stage": None,
+                "timings": {},
+                "result": None,
+                "error": None,
+                "created_at": job.created_at,
+                "finished_at": None,
+                "updated_at": job.created_at,
+            })
+        except Exception as e:
+            await spooled.close()
+            logger.error(f"Enregistrement du traitement de CV impossible: {str(e)}")
+            raise HTTPException(status_code=503, detail="Suivi des traitements indisponible, veuillez réessayer plus tard.")
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            await spooled.close()
+            await self.collection.delete_one({"_id": job.id})
+            raise HTTPException(status_code=503, detail="Trop de CV en cours de traitement, veuillez réessayer plus tard.")
+        return job
+
+    async def get(self, job_id: str) -> Optional[CVProcessingJob]:
+        document = await self.collection.find_one({"_id": job_id})
+        return _job_from_document(document) if document is not None else None
+
+    async def _run_stage(self, job: CVProcessingJob, stage: str, coro):
+        job.stage = stage
+        await self._save(job, "status", "stage", "timings")
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            job.timings[stage] = (time.perf_counter() - started) * 1000
+
+    async def _process(self, job: CVProcessingJob):
+        job.status = "running"
+        job.timings["queued"] = (datetime.utcnow() - job.created_at).total_seconds() * 1000
+        try:
+            cached = await self._run_stage(job, "parsing", cv_service.parse_or_reuse(job.user_id, job.file, job.file_size))
+            cv_id = await self._run_stage(job, "saving", cv_service.save_or_reuse(job.user_id, cached))
+            job.result = await self._run_stage(job, "linking", cv_service.link_cv_to_user(job.user_id, cv_id))
+            job.status = "succeeded"
+        except HTTPException as e:
+            job.status = "failed"
+            job.error = {"status_code": e.status_code, "detail": e.detail}
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = STOPPED_ERROR
+            raise
+        except Exception as e:
+            logger.error(f"Erreur inattendue lors du traitement du CV {job.id}: {str(e)}")
+            job.status = "failed"
+            job.error = {"status_code": 500, "detail": str(e)}
+        finally:
+            job.finished_at = datetime.utcnow()
+            await job.file.close()
+            job.file = None
+            await self._save(job, "status", "stage", "timings", "result", "error", "finished_at")
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._process(job)
+            finally:
+                self.queue.task_done()
+
+cv_pipeline = CVProcessingPipeline(
+    concurrency=settings.CV_PIPELINE_CONCURRENCY,
+    queue_size=settings.CV_PIPELINE_QUEUE_SIZE,
+)
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+from app.config import settings
 from app.services.cv_parsing import cv_service
+from app.services.cv_parsing.pipeline import cv_pipeline
 from app.services.auth.security import get_current_user
 from app.models.postgres.user_model import User
-from app.schemas.interview_schemas import CVParseResponse
+from app.schemas.interview_schemas import CVParseResponse, CVProcessingAccepted, CVProcessingStatus
 
 router = APIRouter()
 
@@ -20,6 +22,37 @@ async def upload_cv_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/cv/async", status_code=status.HTTP_202_ACCEPTED, response_model=CVProcessingAccepted, tags=["cv_parsing"])
+async def upload_cv_async_endpoint(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    job = await cv_pipeline.submit(str(current_user.id), file)
+    return CVProcessingAccepted(
+        processing_id=job.id,
+        status=job.status,
+        status_url=f"{settings.API_V1_STR}/cv_parsing/cv/processing/{job.id}",
+    )
+
+@router.get("/cv/processing/{processing_id}", response_model=CVProcessingStatus, tags=["cv_parsing"])
+async def get_cv_processing_status_endpoint(
+    processing_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    job = await cv_pipeline.get(processing_id)
+    if job is None or job.user_id != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Traitement introuvable ou expiré.")
+    return CVProcessingStatus(
+        processing_id=job.id,
+        status=job.status,
+        stage=job.stage,
+        timings_ms=job.timings,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
 @router.get("/{user_id}", response_model=CVParseResponse, tags=["cv_parsing"])
 async def get_user_cv_by_id_endpoint(
     user_id: str,
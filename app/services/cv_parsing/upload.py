@@ -0,0 +1,110 @@
+import os
+import secrets
+from typing import AsyncIterator, Dict, Tuple
+from fastapi import HTTPException, UploadFile
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.config import settings
+
+PDF_MAGIC = b"%PDF-"
+# La spécification PDF tolère des octets parasites avant l'en-tête, dans le premier kilo-octet.
+PDF_HEADER_WINDOW = 1024
+# Marge pour les en-têtes multipart autour du fichier.
+MULTIPART_OVERHEAD = 64 * 1024
+
+async def validate_pdf_upload(file: UploadFile) -> int:
+    """
+    Vérifie la taille et la signature PDF du fichier avant tout appel à l'API de
+    parsing, puis rembobine le fichier. Retourne sa taille en octets.
+    """
+    size = file.size
+    if size is None:
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+    if size > settings.CV_UPLOAD_MAX_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Fichier trop volumineux (maximum {settings.CV_UPLOAD_MAX_BYTES / (1024 * 1024):g} Mo)",
+        )
+    await file.seek(0)
+    head = await file.read(PDF_HEADER_WINDOW)
+    await file.seek(0)
+    if PDF_MAGIC not in head:
+        raise HTTPException(status_code=400, detail="PDF file required")
+    return size
+
+def _quote_filename(filename: str | None) -> str:
+    name = filename or "cv.pdf"
+    return name.replace("\r", "").replace("\n", "").replace('"', "%22")
+
+def stream_multipart_file(file: UploadFile, size: int, field: str = "file") -> Tuple[Dict[str, str], AsyncIterator[bytes]]:
+    """
+    Construit un corps multipart/form-data diffusé par morceaux depuis le fichier
+    (déjà mis en tampon sur disque par Starlette) : le PDF n'est jamais chargé
+    entièrement en mémoire. La taille maximale est revérifiée pendant l'envoi.
+    """
+    boundary = secrets.token_hex(16)
+    preamble = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{_quote_filename(file.filename)}"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+    epilogue = f"\r\n--{boundary}--\r\n".encode()
+    headers = {
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(len(preamble) + size + len(epilogue)),
+    }
+
+    async def body() -> AsyncIterator[bytes]:
+        yield preamble
+        sent = 0
+        while chunk := await file.read(settings.CV_UPLOAD_CHUNK_SIZE):
+            sent += len(chunk)
+            if sent > size or sent > settings.CV_UPLOAD_MAX_BYTES:
+                raise ValueError("Le fichier a changé de taille pendant l'envoi")
+            yield chunk
+        yield epilogue
+
+    return headers, body()
+
+class UploadSizeLimitMiddleware:
+    """
+    Refuse en 413 les uploads de CV trop volumineux dès la réception : d'après
+    Content-Length quand il est présent, sinon en comptant les octets reçus.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str, max_body_size: int):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_body_size:
+                await self._reject(send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise HTTPException(status_code=413, detail="Fichier trop volumineux")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send: Send):
+        body = b'{"detail":"Fichier trop volumineux"}'
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
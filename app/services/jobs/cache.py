@@ -1,34 +1,318 @@
 import asyncio
+import hashlib
+import heapq
+import json
+import logging
+import os
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from app.clients.job_offer_api import get_job_offers
-from app.schemas.jobs_schemas import JobOffer
+from typing import List, Dict, Any, NamedTuple, Optional, Sequence
+from app.clients.job_offer_api import get_job_offers, get_job_offers_if_changed
+from app.config import settings
+from app.core.metrics import metrics
+from app.core.singleflight import SingleFlight
+from app.schemas.jobs_schemas import JobOffer, JobRefreshStats
+from app.services.jobs.index import JobOfferIndex, MappedJobOfferIndex, parse_publication, tokenize_offer
+from app.services.jobs.snapshot import JobOffersSnapshot, build_snapshot
+from app.services.jobs.storage import PersistedJobOffers, file_signature, read_snapshot_file, write_snapshot_file
 
-cached_job_offers: List[Dict[str, Any]] = []
+class _OfferEntry(NamedTuple):
+    content_hash: str
+    offer: Dict[str, Any]
+    publication: int
+    tokens: frozenset
+
+# Liste en mémoire, ou offres lues à la demande dans le snapshot mappé (follower).
+cached_job_offers: Sequence[Dict[str, Any]] = []
+job_offers_index: JobOfferIndex = JobOfferIndex([])
+job_offers_snapshot: JobOffersSnapshot = build_snapshot([])
 last_update: datetime | None = None
+last_refresh_stats: JobRefreshStats | None = None
 cache_lock = asyncio.Lock()
 
+# État de la synchronisation incrémentale : offres validées par id, dans l'ordre
+# du cache, et validateurs HTTP renvoyés par l'API des offres.
+_offer_entries: Dict[str, _OfferEntry] = {}
+_upstream_etag: Optional[str] = None
+_upstream_last_modified: Optional[str] = None
+# Version du fichier snapshot actuellement chargée (mode cache partagé entre workers).
+_snapshot_signature: Optional[tuple] = None
+_refreshes = SingleFlight()
+# Échecs consécutifs de mise à jour : espacent les nouvelles tentatives (is_refresh_due).
+_failed_refreshes = 0
+_last_failed_refresh: datetime | None = None
+
+logger = logging.getLogger(__name__)
+
+job_refresh_duration = metrics.histogram(
+    "job_refresh_duration_seconds", "Duration of the job offers refreshes, by result.", ("result",)
+)
+job_refresh_offers = metrics.counter(
+    "job_refresh_offers_total", "Offers seen by the refreshes, by diff outcome.", ("change",)
+)
+job_offers_cached = metrics.gauge("job_offers_cached", "Job offers currently served from the cache.")
+job_snapshot_bytes = metrics.gauge("job_snapshot_bytes", "Size of the served job offers snapshot, by encoding.", ("encoding",))
+
+def _content_hash(offer: Dict[str, Any]) -> str:
+    raw = json.dumps(offer, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+def _sort_key(entry: _OfferEntry) -> int:
+    return -entry.publication
+
+def _diff_offers(raw_offers: List[Dict[str, Any]], stats: JobRefreshStats) -> Dict[str, _OfferEntry]:
+    """
+    Ne valide (JobOffer) et ne tokenise que les offres nouvelles ou modifiées.
+    """
+    previous = _offer_entries if stats.incremental else {}
+    entries: Dict[str, _OfferEntry] = {}
+    for raw in raw_offers:
+        offer_id = str(raw.get("id"))
+        content_hash = _content_hash(raw)
+        entry = previous.get(offer_id)
+        if entry is not None and entry.content_hash == content_hash:
+            stats.unchanged += 1
+        else:
+            offer = JobOffer(**raw).model_dump(by_alias=True)
+            publication = parse_publication(offer.get("publication"))
+            entry = _OfferEntry(content_hash, offer, publication if publication is not None else 0, tokenize_offer(offer))
+            if offer_id in previous:
+                stats.changed += 1
+            else:
+                stats.added += 1
+        entries[offer_id] = entry
+    stats.removed = sum(1 for offer_id in previous if offer_id not in entries)
+    stats.total = len(entries)
+    return entries
+
+def _sort_entries(entries: Dict[str, _OfferEntry]) -> List[_OfferEntry]:
+    """
+    Les offres inchangées gardent l'ordre du cache précédent ; seules les nouvelles
+    sont triées, puis fusionnées (date de publication décroissante).
+    """
+    unchanged = [
+        entry for offer_id, entry in _offer_entries.items()
+        if entries.get(offer_id) is entry
+    ]
+    fresh = sorted(
+        (entry for offer_id, entry in entries.items() if _offer_entries.get(offer_id) is not entry),
+        key=_sort_key,
+    )
+    return list(heapq.merge(unchanged, fresh, key=_sort_key))
+
+def _entries_from_persisted(persisted: PersistedJobOffers) -> tuple[List[_OfferEntry], JobOfferIndex]:
+    offers = json.loads(bytes(persisted.snapshot.body))
+    hashes = persisted.content_hashes()
+    if len(offers) != len(hashes):
+        raise ValueError("snapshot incohérent : nombre d'offres et d'empreintes différent")
+    ordered = []
+    for offer, content_hash in zip(offers, hashes):
+        publication = parse_publication(offer.get("publication"))
+        ordered.append(_OfferEntry(content_hash, offer, publication if publication is not None else 0, tokenize_offer(offer)))
+    index = JobOfferIndex(offers, tokens=[entry.tokens for entry in ordered])
+    return ordered, index
+
+async def _persist_job_offers():
+    global _snapshot_signature
+    if not settings.JOBS_SNAPSHOT_PATH:
+        return
+    try:
+        _snapshot_signature = await asyncio.to_thread(
+            write_snapshot_file,
+            settings.JOBS_SNAPSHOT_PATH,
+            job_offers_snapshot,
+            [entry.content_hash for entry in _offer_entries.values()],
+            job_offers_index,
+            last_update,
+            _upstream_etag,
+            _upstream_last_modified,
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de l'écriture du snapshot des offres : {e}")
+
+async def load_persisted_job_offers(check_staleness: bool = True, materialize: bool = True) -> bool:
+    """
+    Démarrage à chaud : charge le snapshot écrit par la dernière mise à jour réussie.
+    Retourne False si aucun snapshot n'est utilisable (absent, illisible ou plus
+    ancien que JOBS_SNAPSHOT_MAX_STALENESS_MINUTES).
+
+    Sans `materialize` (followers du cache partagé), rien n'est décodé : recherche
+    et offres sont lues en place dans le fichier mappé, dont les pages sont
+    partagées par tous les workers. Seul le process qui interroge l'API des offres
+    a besoin des offres en mémoire pour la synchronisation incrémentale.
+    """
+    global cached_job_offers, job_offers_index, job_offers_snapshot, last_update
+    global _offer_entries, _upstream_etag, _upstream_last_modified, _snapshot_signature
+    if not settings.JOBS_SNAPSHOT_PATH:
+        return False
+    try:
+        persisted = await asyncio.to_thread(read_snapshot_file, settings.JOBS_SNAPSHOT_PATH)
+        if persisted is None:
+            return False
+        age = datetime.utcnow() - persisted.last_update
+        if check_staleness and age > timedelta(minutes=settings.JOBS_SNAPSHOT_MAX_STALENESS_MINUTES):
+            logger.info(f"Snapshot des offres trop ancien ({age}), ignoré.")
+            return False
+        if materialize:
+            ordered, index = await asyncio.to_thread(_entries_from_persisted, persisted)
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement du snapshot des offres : {e}")
+        return False
+
+    async with cache_lock:
+        if materialize:
+            cached_job_offers = [entry.offer for entry in ordered]
+            job_offers_index = index
+            _offer_entries = {str(entry.offer["id"]): entry for entry in ordered}
+            _upstream_etag = persisted.upstream_etag
+            _upstream_last_modified = persisted.upstream_last_modified
+        else:
+            cached_job_offers = persisted.index.offers
+            job_offers_index = persisted.index
+            # Sans les offres en mémoire, une réponse 304 de l'API ne saurait pas
+            # republier le snapshot : pas de validateurs HTTP pour un follower.
+            _offer_entries = {}
+            _upstream_etag = _upstream_last_modified = None
+        job_offers_snapshot = persisted.snapshot
+        last_update = persisted.last_update
+        _snapshot_signature = persisted.signature
+    _record_cache_size()
+    logger.info(f"Cache des offres d'emploi chargé depuis le snapshot ({len(cached_job_offers)} offres, âge {age}).")
+    return True
+
+async def reload_job_offers_if_published() -> bool:
+    """
+    Recharge le snapshot si un autre worker en a publié une nouvelle version.
+    """
+    try:
+        signature = file_signature(os.stat(settings.JOBS_SNAPSHOT_PATH))
+    except FileNotFoundError:
+        return False
+    if signature == _snapshot_signature:
+        return False
+    return await load_persisted_job_offers(check_staleness=False, materialize=False)
+
+def job_offers_are_mapped() -> bool:
+    """
+    Vrai si le cache est servi depuis le snapshot mappé, sans offres en mémoire.
+    """
+    return isinstance(job_offers_index, MappedJobOfferIndex)
+
+def is_refresh_due() -> bool:
+    """
+    Après un échec, la tentative suivante attend JOBS_REFRESH_RETRY_SECONDS,
+    doublés à chaque nouvel échec et plafonnés à l'intervalle normal.
+    """
+    now = datetime.utcnow()
+    interval = timedelta(minutes=settings.JOBS_REFRESH_INTERVAL_MINUTES)
+    if _last_failed_refresh is not None:
+        backoff = min(interval, timedelta(seconds=settings.JOBS_REFRESH_RETRY_SECONDS * 2 ** (_failed_refreshes - 1)))
+        if now - _last_failed_refresh < backoff:
+            return False
+    if last_update is None:
+        return True
+    return now - last_update >= interval
+
 async def update_job_offers_cache():
     """
     Tâche de fond pour récupérer les offres d'emploi et mettre à jour le cache.
+    Une mise à jour déjà en cours est partagée plutôt que relancée.
     """
-    global cached_job_offers, last_update
-    print("Mise à jour du cache des offres d'emploi...")
+    await _refreshes.do("refresh", _update_job_offers_cache)
+
+async def _update_job_offers_cache():
+    global cached_job_offers, job_offers_index, job_offers_snapshot, last_update, last_refresh_stats
+    global _offer_entries, _upstream_etag, _upstream_last_modified, _failed_refreshes, _last_failed_refresh
+    logger.info("Mise à jour du cache des offres d'emploi...")
+    started = time.perf_counter()
+    stats = JobRefreshStats(started_at=datetime.utcnow(), incremental=settings.JOBS_INCREMENTAL_SYNC)
     try:
-        job_offers = await get_job_offers()
-        validated_offers = [JobOffer(**offer).model_dump(by_alias=True) for offer in job_offers]
-        validated_offers.sort(key=lambda x: datetime.strptime(x['publication'], "%d/%m/%Y"), reverse=True)
-        
+        if stats.incremental:
+            response = await get_job_offers_if_changed(_upstream_etag, _upstream_last_modified)
+            if response.not_modified:
+                stats.not_modified = True
+                stats.unchanged = stats.total = len(_offer_entries)
+                stats.duration_ms = (time.perf_counter() - started) * 1000
+                last_refresh_stats = stats
+                last_update = datetime.utcnow()
+                _failed_refreshes, _last_failed_refresh = 0, None
+                job_refresh_duration.observe(stats.duration_ms / 1000, "not_modified")
+                job_refresh_offers.inc("unchanged", amount=stats.unchanged)
+                logger.info("Offres d'emploi inchangées (304), cache conservé.")
+                await _persist_job_offers()
+                return
+            job_offers = response.offers
+        else:
+            job_offers = await get_job_offers()
+
+        entries = _diff_offers(job_offers, stats)
+        if stats.incremental and not (stats.added or stats.changed or stats.removed):
+            ordered = [_offer_entries[offer_id] for offer_id in _offer_entries]
+            index, snapshot = job_offers_index, job_offers_snapshot
+        else:
+            ordered = _sort_entries(entries)
+            validated_offers = [entry.offer for entry in ordered]
+            index = JobOfferIndex(validated_offers, tokens=[entry.tokens for entry in ordered])
+            snapshot = await asyncio.to_thread(build_snapshot, validated_offers)
+
         async with cache_lock:
-            cached_job_offers = validated_offers
+            cached_job_offers = [entry.offer for entry in ordered]
+            job_offers_index = index
+            job_offers_snapshot = snapshot
+            _offer_entries = {str(entry.offer["id"]): entry for entry in ordered}
+            if stats.incremental:
+                _upstream_etag, _upstream_last_modified = response.etag, response.last_modified
             last_update = datetime.utcnow()
-            print(f"Cache des offres d'emploi mis à jour. Nombre d'offres : {len(cached_job_offers)}")
-            
+            _failed_refreshes, _last_failed_refresh = 0, None
+            stats.duration_ms = (time.perf_counter() - started) * 1000
+            last_refresh_stats = stats
+            logger.info(
+                f"Cache des offres d'emploi mis à jour. Nombre d'offres : {len(cached_job_offers)} "
+                f"(+{stats.added} ~{stats.changed} -{stats.removed})"
+            )
+        job_refresh_duration.observe(stats.duration_ms / 1000, "updated")
+        for change in ("added", "changed", "removed", "unchanged"):
+            job_refresh_offers.inc(change, amount=getattr(stats, change))
+        _record_cache_size()
+        await _persist_job_offers()
+
     except Exception as e:
-        print(f"Erreur lors de la mise à jour du cache : {e}")
+        _failed_refreshes += 1
+        _last_failed_refresh = datetime.utcnow()
+        job_refresh_duration.observe(time.perf_counter() - started, "error")
+        logger.error(f"Erreur lors de la mise à jour du cache ({_failed_refreshes} échec(s) consécutif(s)) : {e}")
+
+def _record_cache_size():
+    job_offers_cached.set(len(cached_job_offers))
+    snapshot = job_offers_snapshot
+    for encoding, body in (("identity", snapshot.body), ("gzip", snapshot.gzip_body), ("br", snapshot.br_body)):
+        if body is not None:
+            job_snapshot_bytes.set(len(body), encoding)
 
-def get_job_offers_from_cache() -> List[Dict[str, Any]]:
+def get_job_offers_from_cache() -> Sequence[Dict[str, Any]]:
     """
     Récupère les offres d'emploi depuis le cache en mémoire.
     """
-    return cached_job_offers
\ No newline at end of file
+    return cached_job_offers
+
+def get_job_offers_index() -> JobOfferIndex:
+    """
+    Récupère l'index de recherche construit lors de la dernière mise à jour du cache.
+    """
+    return job_offers_index
+
+def get_job_offers_snapshot() -> JobOffersSnapshot:
+    """
+    Récupère la liste des offres pré-sérialisée et pré-compressée.
+    """
+    return job_offers_snapshot
+
+def get_job_cache_status() -> Dict[str, Any]:
+    """
+    Taille du cache et statistiques (ajouts, modifications, suppressions) de la dernière mise à jour.
+    """
+    return {
+        "last_update": last_update,
+        "offers": len(cached_job_offers),
+        "last_refresh": last_refresh_stats,
+    }
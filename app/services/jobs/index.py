@@ -0,0 +1,363 @@
+import base64
+import hashlib
+import json
+import operator
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence as SequenceABC
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+TEXT_FIELDS = ("poste", "entreprise", "competences", "mission")
+FACET_FIELDS = ("ville", "contrat", "pole")
+DATE_FORMAT = "%d/%m/%Y"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def normalize(value: str) -> str:
+    """
+    Minuscules, sans accents : "Développeur" -> "developpeur".
+    """
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).strip()
+
+
+def tokenize(text: str | None) -> List[str]:
+    if not text:
+        return []
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def tokenize_offer(offer: Dict[str, Any]) -> frozenset:
+    tokens: Set[str] = set()
+    for field in TEXT_FIELDS:
+        tokens.update(tokenize(offer.get(field)))
+    return frozenset(tokens)
+
+
+def parse_publication(value: str | None) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, DATE_FORMAT).toordinal()
+    except ValueError:
+        return None
+
+
+def _to_mask(positions: Iterable[int], size: int) -> int:
+    bitmap = bytearray((size + 7) // 8)
+    for pos in positions:
+        bitmap[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bitmap, "little")
+
+
+class JobOfferIndex:
+    """
+    Index inversé (texte libre) et index de facettes sur une liste d'offres triée.
+
+    Les offres sont identifiées par leur position dans la liste, et chaque entrée
+    d'index est un bitmap (int) de positions : les intersections, les comptes de
+    facettes et la pagination se font en C, sans parcourir les offres.
+    """
+
+    def __init__(self, offers: Sequence[Dict[str, Any]], tokens: Optional[Sequence[frozenset]] = None):
+        self.offers = offers
+        self.size = len(offers)
+        self.all_mask = (1 << self.size) - 1
+        postings: Dict[str, List[int]] = {}
+        facets: Dict[str, Dict[str, List[int]]] = {field: {} for field in FACET_FIELDS}
+        self.facet_labels: Dict[str, Dict[str, str]] = {field: {} for field in FACET_FIELDS}
+        self._ordinals: List[Optional[int]] = []
+
+        for pos, offer in enumerate(offers):
+            offer_tokens = tokens[pos] if tokens is not None else tokenize_offer(offer)
+            for token in offer_tokens:
+                postings.setdefault(token, []).append(pos)
+            for field in FACET_FIELDS:
+                raw = offer.get(field)
+                key = normalize(raw) if raw else None
+                if key:
+                    facets[field].setdefault(key, []).append(pos)
+                    self.facet_labels[field].setdefault(key, raw.strip())
+            self._ordinals.append(parse_publication(offer.get("publication")))
+
+        self.postings = {token: _to_mask(positions, self.size) for token, positions in postings.items()}
+        self.facets = {
+            field: {key: _to_mask(positions, self.size) for key, positions in values.items()}
+            for field, values in facets.items()
+        }
+        # Le cache trie les offres par date décroissante : une plage de dates est
+        # alors une plage contiguë de positions.
+        self._sorted_by_date = None not in self._ordinals and all(
+            a >= b for a, b in zip(self._ordinals, self._ordinals[1:])
+        )
+        self._global_facets = self._facet_counts(self.all_mask)
+        digest = hashlib.blake2b(digest_size=6)
+        for offer in offers:
+            digest.update(str(offer.get("id")).encode())
+            digest.update(b"\0")
+        self.version = digest.hexdigest()
+
+    def encode_cursor(self, pos: int) -> str:
+        return base64.urlsafe_b64encode(f"{self.version}.{pos}".encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> int:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            version, pos = base64.urlsafe_b64decode(padded.encode()).decode().split(".", 1)
+            pos = int(pos)
+        except (ValueError, UnicodeDecodeError):
+            raise InvalidCursorError("Curseur invalide")
+        if version != self.version or not 0 <= pos < self.size:
+            raise InvalidCursorError("Curseur expiré : le cache des offres a été mis à jour")
+        return pos
+
+    def _posting(self, token: str) -> int:
+        return self.postings.get(token, 0)
+
+    def _facet(self, field: str, key: str) -> int:
+        return self.facets[field].get(key, 0)
+
+    def _facet_masks(self, field: str) -> Iterator[Tuple[str, int]]:
+        for key, value_mask in self.facets[field].items():
+            yield self.facet_labels[field][key], value_mask
+
+    def _date_mask(self, date_from: Optional[int], date_to: Optional[int]) -> int:
+        if date_from is not None and date_to is not None and date_from > date_to:
+            return 0
+        if self._sorted_by_date:
+            lo = bisect_left(self._ordinals, -date_to, key=operator.neg) if date_to is not None else 0
+            hi = bisect_right(self._ordinals, -date_from, key=operator.neg) if date_from is not None else self.size
+            return ((1 << hi) - 1) ^ ((1 << lo) - 1)
+        return _to_mask(
+            (
+                pos for pos, ordinal in enumerate(self._ordinals)
+                if ordinal
+                and (date_from is None or ordinal >= date_from)
+                and (date_to is None or ordinal <= date_to)
+            ),
+            self.size,
+        )
+
+    def _facet_counts(self, mask: int) -> Dict[str, Dict[str, int]]:
+        counts: Dict[str, Dict[str, int]] = {}
+        for field in FACET_FIELDS:
+            field_counts = {}
+            for label, value_mask in self._facet_masks(field):
+                count = (value_mask & mask).bit_count()
+                if count:
+                    field_counts[label] = count
+            counts[field] = field_counts
+        return counts
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        filters: Optional[Dict[str, List[str]]] = None,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Retourne une page d'offres, le total et les facettes de l'ensemble filtré.
+        """
+        mask = self.all_mask
+        filtered = False
+        for token in tokenize(q):
+            mask &= self._posting(token)
+            filtered = True
+        for field, values in (filters or {}).items():
+            if not values:
+                continue
+            union = 0
+            for value in values:
+                union |= self._facet(field, normalize(value))
+            mask &= union
+            filtered = True
+        if date_from is not None or date_to is not None:
+            mask &= self._date_mask(date_from, date_to)
+            filtered = True
+
+        total = mask.bit_count()
+        facets = self._facet_counts(mask) if filtered else self._global_facets
+
+        start = self.decode_cursor(cursor) + 1 if cursor else 0
+        remaining = mask >> start
+        page: List[int] = []
+        while remaining and len(page) < limit:
+            low_bit = remaining & -remaining
+            offset = low_bit.bit_length() - 1
+            page.append(start + offset)
+            start += offset + 1
+            remaining >>= offset + 1
+
+        return {
+            "items": [self.offers[pos] for pos in page],
+            "total": total,
+            "next_cursor": self.encode_cursor(page[-1]) if remaining and page else None,
+            "facets": facets,
+        }
+
+
+# Format binaire de l'index partagé entre workers (mode cache partagé). Chaque
+# partie est un tableau natif lisible en place via memoryview.cast : le fichier
+# n'est relu que par des process de la même machine.
+_ALIGNMENT = 8
+
+
+def _pack_strings(values: Sequence[bytes]) -> Tuple[bytes, array]:
+    offsets = array("I", [0])
+    for value in values:
+        offsets.append(offsets[-1] + len(value))
+    return b"".join(values), offsets
+
+
+def pack_index(index: JobOfferIndex) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Sérialise l'index pour MappedJobOfferIndex : un bitmap de taille fixe par
+    token et par valeur de facette, les clés triées (recherche dichotomique) et
+    les dates de publication. Retourne le tampon et sa description (en-tête JSON).
+    """
+    stride = (index.size + 7) // 8
+    parts: Dict[str, bytes | array] = {"ordinals": array("i", [ordinal or 0 for ordinal in index._ordinals])}
+    bitmaps: List[bytes] = []
+
+    tokens = sorted((token.encode("utf-8"), mask) for token, mask in index.postings.items())
+    parts["tokens"], parts["token_offsets"] = _pack_strings([token for token, _ in tokens])
+    bitmaps.extend(mask.to_bytes(stride, "little") for _, mask in tokens)
+
+    facet_slots = {}
+    for field in FACET_FIELDS:
+        values = sorted(
+            (key.encode("utf-8"), index.facet_labels[field][key].encode("utf-8"), mask)
+            for key, mask in index.facets[field].items()
+        )
+        facet_slots[field] = len(bitmaps)
+        parts[f"{field}_keys"], parts[f"{field}_key_offsets"] = _pack_strings([key for key, _, _ in values])
+        parts[f"{field}_labels"], parts[f"{field}_label_offsets"] = _pack_strings([label for _, label, _ in values])
+        bitmaps.extend(mask.to_bytes(stride, "little") for _, _, mask in values)
+    parts["bitmaps"] = b"".join(bitmaps)
+
+    chunks: List[bytes] = []
+    layout_parts = {}
+    offset = 0
+    for name, part in parts.items():
+        data = part.tobytes() if isinstance(part, array) else part
+        padding = -offset % _ALIGNMENT
+        chunks.append(b"\0" * padding)
+        offset += padding
+        layout_parts[name] = [offset, len(data)]
+        chunks.append(data)
+        offset += len(data)
+    layout = {
+        "size": index.size,
+        "version": index.version,
+        "sorted_by_date": index._sorted_by_date,
+        "stride": stride,
+        "global_facets": index._global_facets,
+        "facet_slots": facet_slots,
+        "parts": layout_parts,
+    }
+    return b"".join(chunks), layout
+
+
+class _StringTable:
+    """
+    Clés triées lues en place : octets bout à bout et tableau de bornes.
+    """
+
+    def __init__(self, data: memoryview, offsets: memoryview):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]])
+
+    def find(self, key: str) -> Optional[int]:
+        encoded = key.encode("utf-8")
+        i = bisect_left(range(len(self)), encoded, key=self.__getitem__)
+        return i if i < len(self) and self[i] == encoded else None
+
+
+class MappedOffers(SequenceABC):
+    """
+    Offres lues à la demande dans le corps JSON du snapshot : seules celles
+    auxquelles on accède sont décodées.
+    """
+
+    def __init__(self, body: memoryview, offsets: memoryview):
+        self.body = body
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    def __getitem__(self, pos: int) -> Dict[str, Any]:
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError(pos)
+        return json.loads(bytes(self.body[self.offsets[pos]:self.offsets[pos + 1] - 1]))
+
+
+class MappedJobOfferIndex(JobOfferIndex):
+    """
+    JobOfferIndex lu en place dans un tampon écrit par pack_index, en pratique le
+    fichier snapshot mappé en mémoire.
+
+    Les bitmaps ne deviennent des int que le temps d'une requête et seules les
+    offres de la page sont décodées : les workers qui mappent le même fichier en
+    partagent les pages au lieu de garder chacun leurs offres et leur index.
+    """
+
+    def __init__(self, buffer: memoryview, layout: Dict[str, Any], offers: MappedOffers):
+        self.offers = offers
+        self.size = layout["size"]
+        if len(offers) != self.size:
+            raise ValueError("index incohérent avec les offres du snapshot")
+        self.all_mask = (1 << self.size) - 1
+        self.version = layout["version"]
+        self._sorted_by_date = layout["sorted_by_date"]
+        self._global_facets = layout["global_facets"]
+        self._stride = layout["stride"]
+        self._facet_slots = layout["facet_slots"]
+        parts = {name: buffer[offset:offset + length] for name, (offset, length) in layout["parts"].items()}
+        self._ordinals = parts["ordinals"].cast("i")
+        self._bitmaps = parts["bitmaps"]
+        self._tokens = _StringTable(parts["tokens"], parts["token_offsets"].cast("I"))
+        self._facet_keys = {
+            field: _StringTable(parts[f"{field}_keys"], parts[f"{field}_key_offsets"].cast("I"))
+            for field in FACET_FIELDS
+        }
+        self._facet_labels = {
+            field: _StringTable(parts[f"{field}_labels"], parts[f"{field}_label_offsets"].cast("I"))
+            for field in FACET_FIELDS
+        }
+
+    def _bitmap(self, slot: int) -> int:
+        start = slot * self._stride
+        return int.from_bytes(self._bitmaps[start:start + self._stride], "little")
+
+    def _posting(self, token: str) -> int:
+        slot = self._tokens.find(token)
+        return self._bitmap(slot) if slot is not None else 0
+
+    def _facet(self, field: str, key: str) -> int:
+        slot = self._facet_keys[field].find(key)
+        return self._bitmap(self._facet_slots[field] + slot) if slot is not None else 0
+
+    def _facet_masks(self, field: str) -> Iterator[Tuple[str, int]]:
+        labels = self._facet_labels[field]
+        for i in range(len(labels)):
+            yield labels[i].decode("utf-8"), self._bitmap(self._facet_slots[field] + i)
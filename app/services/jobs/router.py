@@ -1,15 +1,73 @@
-from fastapi import APIRouter
-from app.schemas.jobs_schemas import JobOffer
-from app.services.jobs.cache import get_job_offers_from_cache
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from app.config import settings
+from app.core.metrics import metrics
+from app.schemas.jobs_schemas import JobCacheStatus, JobOffer, JobOfferSearchResponse
+from app.services.jobs.cache import get_job_cache_status, get_job_offers_index, get_job_offers_snapshot
+from app.services.jobs.index import InvalidCursorError
 
 router = APIRouter()
 
+job_list_responses = metrics.counter(
+    "job_list_responses_total", "GET /jobs responses: 304 from the client's ETag or snapshot body by encoding.", ("result",)
+)
+
 @router.get("/", response_model=list[JobOffer])
-async def get_all_job_offers():
+async def get_all_job_offers(request: Request):
     """
     Retrieve all job offers from the cache.
+
+    The list is served from the snapshot built at each cache refresh, in the
+    best encoding the client accepts, and answers 304 when the ETag matches.
+    """
+    snapshot = get_job_offers_snapshot()
+    body, encoding = snapshot.select(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": snapshot.etag(encoding),
+        "Cache-Control": f"public, max-age={settings.JOBS_CACHE_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+    if snapshot.matches(request.headers.get("if-none-match")):
+        job_list_responses.inc("not_modified")
+        return Response(status_code=304, headers=headers)
+    job_list_responses.inc(encoding or "identity")
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/search", response_model=JobOfferSearchResponse)
+async def search_job_offers(
+    q: Optional[str] = Query(None, description="Free text over poste, entreprise, competences and mission"),
+    ville: Optional[list[str]] = Query(None),
+    contrat: Optional[list[str]] = Query(None),
+    pole: Optional[list[str]] = Query(None),
+    published_from: Optional[date] = None,
+    published_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """
+    Search the cached job offers with the indexes built at each cache refresh.
+    Results keep the publication order (newest first) and carry facet counts.
+    """
+    index = get_job_offers_index()
+    try:
+        return index.search(
+            q=q,
+            filters={"ville": ville, "contrat": contrat, "pole": pole},
+            date_from=published_from.toordinal() if published_from else None,
+            date_to=published_to.toordinal() if published_to else None,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/status", response_model=JobCacheStatus)
+async def get_job_cache_status_endpoint():
+    """
+    Report the cache size and the added/changed/removed counts of the last refresh.
     """
-    job_offers = get_job_offers_from_cache()
-    if not job_offers:
-        return []
-    return job_offers
\ No newline at end of file
+    return get_job_cache_status()
@@ -0,0 +1,85 @@
+import logging
+import os
+from app.config import settings
+from app.services.jobs.cache import (
+    is_refresh_due,
+    job_offers_are_mapped,
+    load_persisted_job_offers,
+    reload_job_offers_if_published,
+    update_job_offers_cache,
+)
+
+try:
+    import fcntl
+except ImportError:  # pas de flock (Windows) : chaque process se considère leader
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class LeaderLock:
+    """
+    Verrou exclusif non bloquant sur un fichier, conservé tant que le process vit.
+
+    Le noyau libère le verrou à la mort du process : un autre worker le prend
+    alors au tour de synchronisation suivant.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: int | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+
+leader_lock = LeaderLock(f"{settings.JOBS_SNAPSHOT_PATH}.lock")
+
+async def sync_shared_job_cache():
+    """
+    Tâche périodique du mode cache partagé : le leader interroge l'API des offres
+    quand la mise à jour est due et publie le snapshot ; les autres workers
+    mappent simplement le dernier snapshot publié.
+    """
+    if leader_lock.try_acquire():
+        if job_offers_are_mapped():
+            # Follower devenu leader : la synchronisation incrémentale repart des offres décodées.
+            await load_persisted_job_offers(check_staleness=False)
+        if is_refresh_due():
+            await update_job_offers_cache()
+    else:
+        await reload_job_offers_if_published()
+
+async def start_shared_job_cache():
+    if not settings.JOBS_SNAPSHOT_PATH:
+        raise RuntimeError("JOBS_SHARED_CACHE nécessite JOBS_SNAPSHOT_PATH")
+    await load_persisted_job_offers(materialize=leader_lock.try_acquire())
+    await sync_shared_job_cache()
+    role = "leader" if leader_lock.is_leader else "follower"
+    logger.info(f"Cache partagé des offres d'emploi : worker {os.getpid()} {role}.")
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : on sert alors gzip ou identity
+    brotli = None
+
+
+@dataclass(frozen=True)
+class JobOffersSnapshot:
+    """
+    Liste des offres déjà sérialisée en JSON, avec ses variantes compressées.
+
+    Construit une fois par mise à jour du cache ; servir une requête revient
+    ensuite à renvoyer des octets existants. Les corps peuvent aussi être des vues
+    sur un fichier mappé en mémoire (voir storage.py). `offsets` donne le début de
+    chaque offre dans `body`, plus une position finale : l'offre i s'arrête juste
+    avant le séparateur qui précède offsets[i + 1].
+    """
+    body: bytes | memoryview
+    gzip_body: bytes | memoryview
+    br_body: Optional[bytes | memoryview]
+    content_hash: str
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    offsets: Sequence[int] = field(default_factory=lambda: array("Q", [1]))
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        return f'"{self.content_hash}-{encoding}"' if encoding else f'"{self.content_hash}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in candidates:
+            return True
+        return any(self.etag(encoding) in candidates for encoding in (None, "gzip", "br"))
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[bytes | memoryview, Optional[str]]:
+        """
+        Choisit la variante selon l'en-tête Accept-Encoding : br, puis gzip, puis identity.
+        """
+        accepted = _parse_accept_encoding(accept_encoding)
+        if self.br_body is not None and "br" in accepted:
+            return self.br_body, "br"
+        if "gzip" in accepted:
+            return self.gzip_body, "gzip"
+        return self.body, None
+
+
+def _parse_accept_encoding(header: Optional[str]) -> set:
+    accepted = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name)
+    return accepted
+
+
+def build_snapshot(offers: List[Dict[str, Any]]) -> JobOffersSnapshot:
+    """
+    Sérialise et compresse la liste des offres. Fonction CPU, à lancer hors de la boucle d'événements.
+    """
+    # Même octets que json.dumps(offers), en notant où commence chaque offre.
+    parts = [json.dumps(offer, ensure_ascii=False, separators=(",", ":")).encode("utf-8") for offer in offers]
+    offsets = array("Q", [1])
+    for part in parts:
+        offsets.append(offsets[-1] + len(part) + 1)
+    body = b"[" + b",".join(parts) + b"]"
+    return JobOffersSnapshot(
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        br_body=brotli.compress(body, quality=11) if brotli is not None else None,
+        content_hash=hashlib.blake2b(body, digest_size=16).hexdigest(),
+        offsets=offsets,
+    )
@@ -0,0 +1,169 @@
+import json
+import mmap
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.services.jobs.index import JobOfferIndex, MappedJobOfferIndex, MappedOffers, pack_index
+from app.services.jobs.snapshot import JobOffersSnapshot
+
+FORMAT_VERSION = 2
+SECTIONS = ("identity", "gzip", "br", "offsets", "hashes", "index")
+# Les sections binaires sont lues par memoryview.cast : on les aligne.
+_ALIGNMENT = 8
+
+
+@dataclass
+class PersistedJobOffers:
+    snapshot: JobOffersSnapshot
+    index: MappedJobOfferIndex
+    hashes: memoryview
+    hash_size: int
+    last_update: datetime
+    upstream_etag: Optional[str] = None
+    upstream_last_modified: Optional[str] = None
+    signature: Optional[Tuple[int, int]] = None
+
+    def content_hashes(self) -> List[str]:
+        """
+        Empreintes des offres, dans l'ordre du snapshot (utiles au seul leader).
+        """
+        if not self.hash_size:
+            return []
+        return [
+            self.hashes[start:start + self.hash_size].hex()
+            for start in range(0, len(self.hashes), self.hash_size)
+        ]
+
+
+def file_signature(stat: os.stat_result) -> Tuple[int, int]:
+    """
+    Identifie une version publiée du fichier : un remplacement atomique change l'inode.
+    """
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def write_snapshot_file(
+    path: str,
+    snapshot: JobOffersSnapshot,
+    hashes: List[str],
+    index: JobOfferIndex,
+    last_update: datetime,
+    upstream_etag: Optional[str] = None,
+    upstream_last_modified: Optional[str] = None,
+) -> Tuple[int, int]:
+    """
+    Écrit le snapshot sur disque : une ligne d'en-tête JSON, puis les corps
+    identity, gzip et br, les positions des offres, leurs empreintes et l'index
+    de recherche (pack_index) bout à bout. Le fichier est remplacé atomiquement ;
+    retourne la signature de la version publiée.
+    """
+    index_body, index_layout = pack_index(index)
+    bodies = {
+        "identity": snapshot.body,
+        "gzip": snapshot.gzip_body,
+        "br": snapshot.br_body,
+        "offsets": memoryview(snapshot.offsets).cast("B"),
+        "hashes": b"".join(bytes.fromhex(content_hash) for content_hash in hashes),
+        "index": index_body,
+    }
+    sections = {}
+    offset = 0
+    for name in SECTIONS:
+        if bodies[name] is not None:
+            offset += -offset % _ALIGNMENT
+            sections[name] = [offset, len(bodies[name])]
+            offset += len(bodies[name])
+    header = {
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "content_hash": snapshot.content_hash,
+        "created_at": snapshot.created_at.isoformat(),
+        "last_update": last_update.isoformat(),
+        "upstream_etag": upstream_etag,
+        "upstream_last_modified": upstream_last_modified,
+        "hash_size": len(bytes.fromhex(hashes[0])) if hashes else 0,
+        "sections": sections,
+        "index": index_layout,
+    }
+    encoded_header = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    # Espaces de bourrage (ignorés par json.loads) : les sections démarrent alignées.
+    encoded_header += b" " * (-(len(encoded_header) + 1) % _ALIGNMENT)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".job_offers.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(encoded_header)
+            f.write(b"\n")
+            written = 0
+            for name in SECTIONS:
+                if name in sections:
+                    offset, length = sections[name]
+                    f.write(b"\0" * (offset - written))
+                    f.write(bodies[name])
+                    written = offset + length
+            f.flush()
+            os.fsync(f.fileno())
+            signature = file_signature(os.fstat(f.fileno()))
+        os.replace(tmp_path, path)
+        return signature
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def read_snapshot_file(path: str) -> Optional[PersistedJobOffers]:
+    """
+    Mappe le fichier en mémoire (lecture seule) : les corps du snapshot et l'index
+    sont des vues sur le mapping, sans copie ; seul l'en-tête est décodé. Retourne
+    None si le fichier est absent ou illisible.
+    """
+    try:
+        with open(path, "rb") as f:
+            signature = file_signature(os.fstat(f.fileno()))
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    try:
+        header_end = mapped.find(b"\n")
+        header = json.loads(mapped[:header_end])
+        if header.get("format") != FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+            return None
+        view = memoryview(mapped)
+        base = header_end + 1
+        if any(base + offset + length > len(mapped) for offset, length in header["sections"].values()):
+            return None
+        bodies = {
+            name: view[base + offset:base + offset + length]
+            for name, (offset, length) in header["sections"].items()
+        }
+        offsets = bodies["offsets"].cast("Q")
+        snapshot = JobOffersSnapshot(
+            body=bodies["identity"],
+            gzip_body=bodies["gzip"],
+            br_body=bodies.get("br"),
+            content_hash=header["content_hash"],
+            created_at=datetime.fromisoformat(header["created_at"]),
+            offsets=offsets,
+        )
+        hash_size = header["hash_size"]
+        if hash_size and len(bodies["hashes"]) != hash_size * (len(offsets) - 1):
+            return None
+        return PersistedJobOffers(
+            snapshot=snapshot,
+            index=MappedJobOfferIndex(bodies["index"], header["index"], MappedOffers(snapshot.body, offsets)),
+            hashes=bodies["hashes"],
+            hash_size=hash_size,
+            last_update=datetime.fromisoformat(header["last_update"]),
+            upstream_etag=header.get("upstream_etag"),
+            upstream_last_modified=header.get("upstream_last_modified"),
+            signature=signature,
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
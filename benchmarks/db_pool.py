@@ -0,0 +1,96 @@
+"""
+`/auth/validate` under concurrency with the previous NullPool engine versus
+the pooled engine, against a real PostgreSQL (the benchmark creates the
+`user` table if needed and seeds one user).
+
+    python -m benchmarks.db_pool --database-url postgresql+asyncpg://postgres@127.0.0.1:5432/postgres
+
+Modes:
+- null/pgbouncer: one connection per request, no statement cache (previous behaviour);
+- queue/pgbouncer: pooled connections, safe behind pgbouncer transaction pooling;
+- queue/direct: pooled connections with asyncpg's statement cache on.
+"""
+import argparse
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import delete
+
+from app.config import settings
+from app.core.database import build_engine, build_sessionmaker
+from app.models.postgres.user_model import Base, User
+from app.services.auth import router as auth_router_module
+from app.services.auth.service import create_access_token
+from benchmarks.stats import print_table, run_load
+
+EMAIL = "bench-db-pool@example.com"
+
+MODES = {
+    "null/pgbouncer": ("null", True),
+    "queue/pgbouncer": ("queue", True),
+    "queue/direct": ("queue", False),
+}
+
+
+async def seed(database_url: str):
+    engine = build_engine(database_url, pool_mode="null", pgbouncer=True)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(delete(User).where(User.email == EMAIL))
+        await connection.execute(User.__table__.insert().values(email=EMAIL, name="Bench", is_active=True))
+    await engine.dispose()
+
+
+def validate_app(session_factory) -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth_router_module.router, prefix=f"{settings.API_V1_STR}/auth")
+
+    async def get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[auth_router_module.get_db] = get_db
+    return app
+
+
+async def bench_mode(database_url: str, pool_mode: str, pgbouncer: bool, requests: int, concurrency: int):
+    engine = build_engine(database_url, pool_mode=pool_mode, pgbouncer=pgbouncer)
+    app = validate_app(build_sessionmaker(engine))
+    token = create_access_token({"sub": EMAIL})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={"access_token": token}) as client:
+
+        async def validate():
+            response = await client.post(f"{settings.API_V1_STR}/auth/validate")
+            response.raise_for_status()
+            if not response.json()["valid"]:
+                raise RuntimeError("token rejected")
+
+        await run_load(validate, min(requests, 50), concurrency)  # warm-up
+        result = await run_load(validate, requests, concurrency)
+    await engine.dispose()
+    return result
+
+
+async def bench(database_url: str, requests: int, concurrency: int):
+    await seed(database_url)
+    results = {}
+    for name, (pool_mode, pgbouncer) in MODES.items():
+        results[name] = await bench_mode(database_url, pool_mode, pgbouncer, requests, concurrency)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=str(settings.ASYNC_DATABASE_URL))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args.database_url, args.requests, args.concurrency))
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
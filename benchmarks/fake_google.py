@@ -0,0 +1,96 @@
+"""
+Offline stand-in for Google's OAuth endpoints: token exchange (with a signed
+id_token), userinfo and the JWKS key set, each with configurable latency.
+
+Serve it with `benchmarks.stand_in.serve("benchmarks.fake_google:google_app")`
+and point GOOGLE_TOKEN_URL, GOOGLE_USERINFO_URL and GOOGLE_JWKS_URL at it.
+Environment:
+    BENCH_GOOGLE_CLIENT_ID   audience of the issued id_tokens
+    BENCH_GOOGLE_LATENCY_MS  added to every response (default 50)
+"""
+import asyncio
+import base64
+import hashlib
+import os
+import secrets
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, Form, Header, HTTPException, Response
+from jose import jwk, jwt
+
+KID = "stand-in-key"
+ISSUER = "https://accounts.google.com"
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def google_app() -> FastAPI:
+    client_id = os.environ["BENCH_GOOGLE_CLIENT_ID"]
+    latency = float(os.environ.get("BENCH_GOOGLE_LATENCY_MS", "50")) / 1000
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    # Built once: parsing the PEM on every jwt.encode costs tens of milliseconds.
+    signing_key = jwk.construct(private_pem, "RS256")
+    public_jwk = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": KID, "use": "sig"}
+    app = FastAPI()
+
+    def user(code: str) -> dict:
+        return {
+            "id": f"google-{code}",
+            "email": f"{code}@example.com",
+            "verified_email": True,
+            "name": f"User {code}",
+            "picture": f"https://example.com/{code}.png",
+        }
+
+    @app.post("/token")
+    async def token(code: str = Form(...), client_id_form: str = Form(..., alias="client_id")):
+        await asyncio.sleep(latency)
+        if client_id_form != client_id:
+            raise HTTPException(status_code=401, detail="invalid_client")
+        access_token = f"{code}.{secrets.token_urlsafe(16)}"
+        info = user(code)
+        now = int(time.time())
+        id_token = jwt.encode(
+            {
+                "iss": ISSUER,
+                "aud": client_id,
+                "sub": info["id"],
+                "email": info["email"],
+                "email_verified": True,
+                "name": info["name"],
+                "picture": info["picture"],
+                "iat": now,
+                "exp": now + 3600,
+                "at_hash": _b64url(hashlib.sha256(access_token.encode()).digest()[:16]),
+            },
+            signing_key,
+            algorithm="RS256",
+            headers={"kid": KID},
+        )
+        return {"access_token": access_token, "id_token": id_token, "token_type": "Bearer", "expires_in": 3599}
+
+    @app.get("/userinfo")
+    async def userinfo(authorization: str = Header(...)):
+        await asyncio.sleep(latency)
+        return user(authorization.removeprefix("Bearer ").split(".", 1)[0])
+
+    @app.get("/certs")
+    async def certs(response: Response):
+        await asyncio.sleep(latency)
+        response.headers["Cache-Control"] = "public, max-age=21600"
+        return {"keys": [public_jwk]}
+
+    return app
@@ -0,0 +1,124 @@
+"""
+Offline stand-in for the three HTTP upstreams of the service: the job offers
+feed (JOB_API_URL), the CV parsing API (CV_API_URL) and the data-access API
+(DATA_ACCESS_API_URL), with configurable latency and error rate.
+
+Serve it with `benchmarks.stand_in.serve("benchmarks.fake_upstreams:upstreams_app")`
+and point the three URLs at it (JOB_API_URL at <url>/jobs).
+Environment:
+    BENCH_UPSTREAM_LATENCY_MS      added to every response (default 20)
+    BENCH_UPSTREAM_JITTER_MS       uniform +/- jitter around the latency (default 0)
+    BENCH_UPSTREAM_ERROR_RATE      fraction of requests answered 503 (default 0)
+    BENCH_<NAME>_LATENCY_MS / BENCH_<NAME>_ERROR_RATE
+                                   per-upstream overrides, NAME in JOB_API, CV_API, DATA_ACCESS
+    BENCH_JOB_OFFERS               size of the job feed (default 500)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import uuid
+from typing import Dict
+
+from fastapi import FastAPI, HTTPException, Request, Response
+
+UPSTREAMS = ("job_api", "cv_api", "data_access")
+CITIES = ["Paris", "Lyon", "Lille", "Nantes", "Bordeaux", "Toulouse"]
+CONTRACTS = ["CDI", "CDD", "Alternance", "Stage"]
+POLES = ["Data", "Tech", "Produit", "Marketing"]
+SKILLS = ["python", "sql", "fastapi", "react", "docker", "spark", "pandas", "kubernetes"]
+
+
+class Behaviour:
+    def __init__(self, name: str):
+        prefix = f"BENCH_{name.upper()}_"
+        self.latency = float(os.environ.get(f"{prefix}LATENCY_MS", os.environ.get("BENCH_UPSTREAM_LATENCY_MS", "20"))) / 1000
+        self.jitter = float(os.environ.get("BENCH_UPSTREAM_JITTER_MS", "0")) / 1000
+        self.error_rate = float(os.environ.get(f"{prefix}ERROR_RATE", os.environ.get("BENCH_UPSTREAM_ERROR_RATE", "0")))
+
+    async def __call__(self):
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            raise HTTPException(status_code=503, detail="injected failure")
+
+
+def job_offers(count: int) -> list:
+    rng = random.Random(42)
+    return [
+        {
+            "id": str(index),
+            "entreprise": f"Entreprise {index % 97}",
+            "ville": rng.choice(CITIES),
+            "poste": f"Développeur {rng.choice(SKILLS)}",
+            "contrat": rng.choice(CONTRACTS),
+            "publication": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "mission": " ".join(rng.sample(SKILLS, 4)) + " " + "x" * 400,
+            "competences": ", ".join(rng.sample(SKILLS, 3)),
+            "pole": rng.choice(POLES),
+        }
+        for index in range(count)
+    ]
+
+
+def parsed_cv(digest: str) -> dict:
+    return {
+        "candidat": {
+            "nom": f"Candidat {digest[:8]}",
+            "competences": SKILLS[:5],
+            "experiences": [{"poste": "Développeur", "entreprise": "Exemple", "duree": "2 ans"}] * 3,
+        }
+    }
+
+
+def upstreams_app() -> FastAPI:
+    behaviour: Dict[str, Behaviour] = {name: Behaviour(name) for name in UPSTREAMS}
+    feed = json.dumps(job_offers(int(os.environ.get("BENCH_JOB_OFFERS", "500")))).encode()
+    feed_etag = f'"{hashlib.sha256(feed).hexdigest()[:16]}"'
+    cvs: Dict[str, dict] = {}
+    users: Dict[str, dict] = {}
+    app = FastAPI()
+
+    @app.get("/jobs")
+    async def jobs(request: Request):
+        await behaviour["job_api"]()
+        if request.headers.get("if-none-match") == feed_etag:
+            return Response(status_code=304, headers={"ETag": feed_etag})
+        return Response(content=feed, media_type="application/json", headers={"ETag": feed_etag})
+
+    @app.post("/parse-cv/")
+    async def parse_cv(request: Request):
+        digest = hashlib.sha256()
+        async for chunk in request.stream():
+            digest.update(chunk)
+        await behaviour["cv_api"]()
+        return parsed_cv(digest.hexdigest())
+
+    @app.post("/api/v1/cvs")
+    async def create_cv(request: Request):
+        await behaviour["data_access"]()
+        document = {**await request.json(), "_id": uuid.uuid4().hex[:24]}
+        cvs[document["_id"]] = document
+        return document
+
+    @app.get("/api/v1/cvs/{cv_id}")
+    async def get_cv(cv_id: str):
+        await behaviour["data_access"]()
+        return cvs.get(cv_id) or {"_id": cv_id, "parsed_data": parsed_cv(cv_id)}
+
+    @app.get("/api/v1/users/{user_id}")
+    async def get_user(user_id: str):
+        await behaviour["data_access"]()
+        # Unknown users already have a CV, so that reads work without a prior upload.
+        return users.get(user_id) or {"id": user_id, "candidate_mongo_id": hashlib.sha256(user_id.encode()).hexdigest()[:24]}
+
+    @app.put("/api/v1/users/{user_id}")
+    async def update_user(user_id: str, request: Request):
+        await behaviour["data_access"]()
+        user = users.setdefault(user_id, {"id": user_id})
+        user.update(await request.json())
+        return user
+
+    return app
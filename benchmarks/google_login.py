@@ -0,0 +1,56 @@
+"""
+Google login round trips: token exchange followed by the userinfo call (the
+previous flow) versus local id_token verification against the cached JWKS,
+with the offline stand-in from benchmarks.fake_google.
+
+    python -m benchmarks.google_login --requests 200 --concurrency 10 --latency-ms 50
+"""
+import argparse
+import asyncio
+import itertools
+
+from app.config import settings
+from app.core.http import http_clients
+from app.services.auth.oauth_service import google_jwks, oauth_service
+from benchmarks.stand_in import serve
+from benchmarks.stats import print_table, run_load
+
+
+async def bench(url: str, requests: int, concurrency: int):
+    settings.GOOGLE_TOKEN_URL = f"{url}/token"
+    settings.GOOGLE_USERINFO_URL = f"{url}/userinfo"
+    google_jwks.url = f"{url}/certs"
+    provider = oauth_service.providers["google"]
+    codes = itertools.count()
+
+    async def login():
+        code = f"user{next(codes)}"
+        info = await provider.get_user_info(code)
+        if info["email"] != f"{code}@example.com":
+            raise RuntimeError(f"unexpected user {info}")
+
+    results = {}
+    for name, verify in (("token + userinfo", False), ("token + local id_token", True)):
+        settings.GOOGLE_VERIFY_ID_TOKEN = verify
+        await run_load(login, min(requests, 20), concurrency)  # warm-up (and JWKS fetch)
+        results[name] = await run_load(login, requests, concurrency)
+    await http_clients.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    env = {"BENCH_GOOGLE_CLIENT_ID": settings.GOOGLE_CLIENT_ID, "BENCH_GOOGLE_LATENCY_MS": str(args.latency_ms)}
+    with serve("benchmarks.fake_google:google_app", env=env) as stand_in:
+        results = asyncio.run(bench(stand_in.url, args.requests, args.concurrency))
+    print_table(results)
+    print(f"JWKS fetches: {google_jwks.fetches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-call `httpx.AsyncClient` (the previous pattern) versus the pooled client
+registry, against a local stand-in upstream.
+
+    python -m benchmarks.http_clients --requests 2000 --concurrency 20 --tls
+"""
+import argparse
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.http import HttpClientRegistry, UpstreamConfig
+from benchmarks.stand_in import StandIn, serve
+from benchmarks.stats import print_table, run_load
+
+
+def upstream_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/users/{user_id}")
+    async def user(user_id: str):
+        return {"id": user_id, "candidate_mongo_id": "656f0c0e2a9d4b0012345678"}
+
+    return app
+
+
+async def bench(stand_in: StandIn, requests: int, concurrency: int):
+    url = f"{stand_in.url}/api/v1/users/42"
+    verify = stand_in.ca_file or True
+
+    async def per_call():
+        async with httpx.AsyncClient(timeout=10, verify=verify) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+
+    registry = HttpClientRegistry()
+    registry.register("stand_in", UpstreamConfig(
+        timeout=httpx.Timeout(10),
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+        verify=verify,
+    ))
+
+    async def pooled():
+        response = await registry.get("stand_in").get(url)
+        response.raise_for_status()
+
+    results = {}
+    for name, call in (("per-call client", per_call), ("pooled registry", pooled)):
+        await run_load(call, min(requests, 50), concurrency)  # warm-up
+        results[name] = await run_load(call, requests, concurrency)
+    await registry.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--tls", action="store_true", help="serve the stand-in over TLS to include handshake cost")
+    args = parser.parse_args()
+
+    with serve("benchmarks.http_clients:upstream_app", tls=args.tls) as stand_in:
+        results = asyncio.run(bench(stand_in, args.requests, args.concurrency))
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
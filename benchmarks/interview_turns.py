@@ -0,0 +1,51 @@
+"""
+Bytes on the wire per interview turn as the conversation grows: rewriting
+the whole conversation with $set and reading the whole document (the
+previous pattern) versus append_turns ($push) and get_last_turns ($slice).
+
+    python -m benchmarks.interview_turns --turns 400 --turn-bytes 600
+
+Runs against an in-process mongomock collection and measures the BSON size
+of each update and of each returned document.
+"""
+import argparse
+import asyncio
+
+import bson
+from mongomock_motor import AsyncMongoMockClient
+
+from app.models.mongo.interview_history_model import InterviewHistoryModel
+
+COLLECTION = "bench_interviews"
+
+
+async def bench(turns: int, turn_bytes: int, tail: int):
+    db = AsyncMongoMockClient()["bench"]
+    interview_id = await InterviewHistoryModel.create(db, COLLECTION, {"user_id": "user", "conversation": []})
+    query = {"_id": bson.ObjectId(interview_id)}
+    conversation = []
+    checkpoints = {max(1, turns // 8), turns // 4, turns // 2, turns}
+    print(f"{'turns':>7}{'$set write':>13}{'$push write':>13}{'full read':>12}{'tail read':>12}   (bytes)")
+    for index in range(1, turns + 1):
+        turn = {"role": "user" if index % 2 else "assistant", "content": "x" * turn_bytes}
+        conversation.append(turn)
+        await InterviewHistoryModel.append_turns(db, COLLECTION, query, [turn])
+        if index in checkpoints:
+            set_write = len(bson.encode({"q": query, "u": {"$set": {"conversation": conversation}}}))
+            push_write = len(bson.encode({"q": query, "u": {"$push": {"conversation": {"$each": [turn]}}}}))
+            full_read = len(bson.encode(await InterviewHistoryModel.get(db, COLLECTION, query)))
+            tail_read = len(bson.encode({"conversation": await InterviewHistoryModel.get_last_turns(db, COLLECTION, query, tail)}))
+            print(f"{index:>7}{set_write:>13}{push_write:>13}{full_read:>12}{tail_read:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=400)
+    parser.add_argument("--turn-bytes", type=int, default=600)
+    parser.add_argument("--tail", type=int, default=6, help="turns returned by the tail read")
+    args = parser.parse_args()
+    asyncio.run(bench(args.turns, args.turn_bytes, args.tail))
+
+
+if __name__ == "__main__":
+    main()
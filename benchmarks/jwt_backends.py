@@ -0,0 +1,67 @@
+"""
+Throughput of access-token encoding and verification for each available JWT
+backend, with and without the verified-token cache.
+
+    python -m benchmarks.jwt_backends --iterations 20000
+
+The "decode (cached)" row replays one token, like a browser session does.
+The "decode (distinct)" row verifies a different token each time, so every
+call misses the cache.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+from app.services.auth.tokens import JWT_BACKENDS, VerifiedTokenCache, get_jwt_backend
+
+SECRET = "benchmark-secret-key-of-at-least-32-bytes"
+ALGORITHM = "HS256"
+
+
+def ops_per_second(call: Callable[[int], object], iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        call(i)
+    return iterations / (time.perf_counter() - started)
+
+
+def claims(i: int) -> Dict[str, object]:
+    return {"sub": f"user-{i}@example.com", "exp": datetime.utcnow() + timedelta(minutes=30)}
+
+
+def bench_backend(name: str, iterations: int) -> Dict[str, float]:
+    backend = get_jwt_backend(name)
+    tokens = [backend.encode(claims(i), SECRET, ALGORITHM) for i in range(iterations)]
+    cached = VerifiedTokenCache(backend, max_entries=iterations)
+    results = {
+        "encode": ops_per_second(lambda i: backend.encode(claims(i), SECRET, ALGORITHM), iterations),
+        "decode": ops_per_second(lambda i: backend.decode(tokens[i], SECRET, [ALGORITHM]), iterations),
+        "decode (cached)": ops_per_second(lambda i: cached.decode(tokens[0], SECRET, [ALGORITHM]), iterations),
+    }
+    cached.clear()
+    results["decode (distinct)"] = ops_per_second(lambda i: cached.decode(tokens[i], SECRET, [ALGORITHM]), iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--backend", action="append", choices=sorted(JWT_BACKENDS), help="defaults to every installed backend")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.backend or JWT_BACKENDS:
+        try:
+            results[name] = bench_backend(name, args.iterations)
+        except RuntimeError as e:
+            print(f"skipping {name}: {e}")
+
+    operations = ["encode", "decode", "decode (cached)", "decode (distinct)"]
+    print("ops/s".ljust(10) + "".join(operation.rjust(20) for operation in operations))
+    for name, result in results.items():
+        print(name.ljust(10) + "".join(f"{result[operation]:.0f}".rjust(20) for operation in operations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+End-to-end load test of the whole service, served by uvicorn in its own
+process, against local stand-ins: fake job/CV/data-access APIs
+(benchmarks.fake_upstreams), fake Google (benchmarks.fake_google), an
+in-memory MongoDB (mongomock) and a throwaway PostgreSQL server, unless
+--database-url points at an existing one.
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.load_test --requests 500 --concurrency 20 --output results.json
+    python -m benchmarks.load_test ... --compare results.json
+
+Scenarios (--scenarios, all by default):
+- jobs: job list (compressed body, then 304 revalidation) and searches;
+- cv_upload: POST /cv_parsing/cv with a distinct PDF each time (parse, save, link);
+- cv_read: GET /cv_parsing/{user_id};
+- token_validation: POST /auth/validate;
+- oauth_callback: Google callback for --oauth-users rotating users (upserts).
+All but `jobs` need PostgreSQL: --database-url (or BENCH_DATABASE_URL), or
+by default a throwaway local server started with pgserver
+(benchmarks/requirements.txt); --no-local-postgres skips them instead.
+
+Upstream behaviour: --latency-ms and --error-rate, either a single value for
+all upstreams or NAME=VALUE with NAME in job_api, cv_api, data_access, google.
+--output writes the results with the commit and the configuration, and
+--compare prints the change against such a file.
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import random
+import subprocess
+from contextlib import ExitStack
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fake_upstreams import UPSTREAMS
+from benchmarks.stand_in import postgres, serve
+from benchmarks.stats import print_table, run_load
+
+EMAIL = "bench-load-test@example.com"
+SEARCHES = ["python", "data paris", "react", "sql cdi", "docker", "stage lyon"]
+SCENARIOS = ("jobs", "cv_upload", "cv_read", "token_validation", "oauth_callback")
+DATABASE_SCENARIOS = set(SCENARIOS) - {"jobs"}
+COMPARED = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def upstream_options(values: List[str], kind: str) -> Dict[str, str]:
+    """
+    ["30"] -> every upstream; ["cv_api=800", "google=40"] -> per upstream.
+    """
+    options = {}
+    for value in values:
+        name, _, amount = value.rpartition("=")
+        names = [name] if name else [*UPSTREAMS, "google"]
+        for name in names:
+            if name not in (*UPSTREAMS, "google"):
+                raise SystemExit(f"unknown upstream for --{kind}: {name}")
+            options[name] = amount
+    return options
+
+
+async def seed(database_url: str) -> str:
+    from sqlalchemy import delete
+
+    from app.core.database import build_engine
+    from app.models.postgres.user_model import Base, User
+
+    engine = build_engine(database_url, pool_mode="null")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(delete(User).where(User.email == EMAIL))
+        result = await connection.execute(
+            User.__table__.insert().values(email=EMAIL, name="Bench", is_active=True).returning(User.id)
+        )
+        user_id = result.scalar_one()
+    await engine.dispose()
+    return str(user_id)
+
+
+def pdf(index: int) -> bytes:
+    return b"%PDF-1.4\n" + f"% bench {index} {random.random()}\n".encode() + os.urandom(20_000) + b"\n%%EOF\n"
+
+
+def expect(response: httpx.Response, *statuses: int):
+    if response.status_code not in statuses:
+        raise RuntimeError(f"{response.request.method} {response.request.url.path}: {response.status_code}")
+
+
+def scenarios(client: httpx.AsyncClient, api: str, user_id: Optional[str], oauth_users: int) -> Dict[str, Callable]:
+    state = {"etag": None}
+    uploads = itertools.count()
+    logins = itertools.count()
+    steps = itertools.count()
+
+    async def jobs():
+        step = next(steps) % 4
+        if step == 0:
+            response = await client.get(f"{api}/jobs/", headers={"Accept-Encoding": "gzip, br"})
+            expect(response, 200)
+            state["etag"] = response.headers.get("ETag")
+        elif step == 1 and state["etag"]:
+            response = await client.get(f"{api}/jobs/", headers={"Accept-Encoding": "gzip, br", "If-None-Match": state["etag"]})
+            expect(response, 304)
+        else:
+            response = await client.get(f"{api}/jobs/search", params={"q": random.choice(SEARCHES), "limit": 20})
+            expect(response, 200)
+
+    async def cv_upload():
+        index = next(uploads)
+        response = await client.post(
+            f"{api}/cv_parsing/cv",
+            files={"file": (f"cv-{index}.pdf", pdf(index), "application/pdf")},
+        )
+        expect(response, 200)
+
+    async def cv_read():
+        response = await client.get(f"{api}/cv_parsing/{user_id}")
+        expect(response, 200)
+
+    async def token_validation():
+        response = await client.post(f"{api}/auth/validate")
+        expect(response, 200)
+        if not response.json()["valid"]:
+            raise RuntimeError("token rejected")
+
+    async def oauth_callback():
+        code = f"bench{next(logins) % oauth_users}"
+        response = await client.get(f"{api}/auth/oauth/google/callback", params={"code": code})
+        expect(response, 302, 307)
+        if "error=" in response.headers.get("location", ""):
+            raise RuntimeError(f"login failed: {response.headers['location']}")
+
+    return {
+        "jobs": jobs,
+        "cv_upload": cv_upload,
+        "cv_read": cv_read,
+        "token_validation": token_validation,
+        "oauth_callback": oauth_callback,
+    }
+
+
+async def bench(url: str, names: List[str], user_id: Optional[str], token: Optional[str], args) -> Dict[str, Dict[str, float]]:
+    from app.config import settings
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    cookies = {"access_token": token} if token else {}
+    results = {}
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120, cookies=cookies) as client:
+        calls = scenarios(client, settings.API_V1_STR, user_id, args.oauth_users)
+        for name in names:
+            await run_load(calls[name], min(args.requests, 20), args.concurrency)  # warm-up
+            results[name] = await run_load(calls[name], args.requests, args.concurrency)
+    return results
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results: Dict[str, Dict[str, float]], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nChange against {baseline_path} (commit {baseline.get('commit')}):")
+    width = max(len(name) for name in results) + 2
+    print("".ljust(width) + "".join(column.rjust(12) for column in COMPARED))
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        cells = []
+        for column in COMPARED:
+            change = (result[column] - before[column]) / before[column] * 100 if before[column] else 0.0
+            cells.append(f"{change:+.1f}%".rjust(12))
+        print(name.ljust(width) + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL"))
+    parser.add_argument("--no-local-postgres", action="store_true", help="without --database-url, skip the database scenarios")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", action="append", default=[], metavar="[NAME=]MS")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="[NAME=]RATE")
+    parser.add_argument("--job-offers", type=int, default=500)
+    parser.add_argument("--oauth-users", type=int, default=100)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args()
+
+    from app.config import settings
+    from app.services.auth.service import create_access_token
+
+    names = list(args.scenarios)
+    with ExitStack() as stack:
+        if not args.database_url and DATABASE_SCENARIOS & set(names):
+            reason = "--no-local-postgres"
+            if not args.no_local_postgres:
+                try:
+                    args.database_url = stack.enter_context(postgres())
+                except ImportError:
+                    reason = "pgserver is not installed (pip install -r benchmarks/requirements.txt)"
+            if not args.database_url:
+                print(f"No database ({reason}): skipping {', '.join(name for name in names if name in DATABASE_SCENARIOS)}")
+                names = [name for name in names if name not in DATABASE_SCENARIOS]
+        if not names:
+            return
+
+        latency = {"job_api": "50", "cv_api": "300", "data_access": "20", "google": "50", **upstream_options(args.latency_ms, "latency-ms")}
+        errors = upstream_options(args.error_rate, "error-rate")
+        upstream_env = {"BENCH_JOB_OFFERS": str(args.job_offers)}
+        for name in UPSTREAMS:
+            upstream_env[f"BENCH_{name.upper()}_LATENCY_MS"] = latency[name]
+            upstream_env[f"BENCH_{name.upper()}_ERROR_RATE"] = errors.get(name, "0")
+        google_env = {"BENCH_GOOGLE_CLIENT_ID": settings.GOOGLE_CLIENT_ID, "BENCH_GOOGLE_LATENCY_MS": latency["google"]}
+
+        user_id = token = None
+        if args.database_url:
+            user_id = asyncio.run(seed(args.database_url))
+            token = create_access_token({"sub": EMAIL}, expires_delta=datetime.timedelta(hours=2))
+
+        upstreams = stack.enter_context(serve("benchmarks.fake_upstreams:upstreams_app", env=upstream_env))
+        google = stack.enter_context(serve("benchmarks.fake_google:google_app", env=google_env))
+        service_env = {
+            "JOB_API_URL": f"{upstreams.url}/jobs",
+            "CV_API_URL": upstreams.url,
+            "DATA_ACCESS_API_URL": upstreams.url,
+            "GOOGLE_TOKEN_URL": f"{google.url}/token",
+            "GOOGLE_USERINFO_URL": f"{google.url}/userinfo",
+            "GOOGLE_JWKS_URL": f"{google.url}/certs",
+            "JOBS_SNAPSHOT_PATH": "",
+            "CONTACT_EMAIL_PROVIDER": "fake",
+            "LOG_LEVEL": "WARNING",
+        }
+        if args.database_url:
+            service_env["ASYNC_DATABASE_URL"] = args.database_url
+        service = stack.enter_context(serve("benchmarks.service_stand_in:service_app", env=service_env, lifespan=True, startup_timeout=60))
+        results = asyncio.run(bench(service.url, names, user_id, token, args))
+
+    print_table(results)
+    if args.output:
+        report = {
+            "commit": current_commit(),
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "config": {
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "latency_ms": latency,
+                "error_rate": errors,
+                "job_offers": args.job_offers,
+                "db_pool_mode": os.environ.get("DB_POOL_MODE", settings.DB_POOL_MODE),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
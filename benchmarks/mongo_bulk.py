@@ -0,0 +1,176 @@
+"""
+One-document-per-call writes (create/update/delete) versus the bulk API
+(bulk_create/bulk_upsert/bulk_delete) on BaseMongoModel.
+
+    python -m benchmarks.mongo_bulk --documents 5000 --mongo-uri mongodb://127.0.0.1:27017
+    python -m benchmarks.mongo_bulk --documents 5000 --rtt-ms 1
+
+Without --mongo-uri the writes go to an in-process mongomock stand-in that
+adds --rtt-ms of latency to every call, to model the network round trip
+that bulk writes save. Against a real server, round trips are counted with a
+pymongo CommandListener.
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from pymongo import DeleteOne, UpdateOne, monitoring
+
+from app.models.mongo.feedback_model import FeedbackModel
+
+COLLECTION = "bench_bulk_feedback"
+
+
+class WriteCommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in ("insert", "update", "delete"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class StandInCollection:
+    """mongomock collection behind a fixed per-call latency."""
+
+    def __init__(self, collection, rtt: float, counter: WriteCommandCounter):
+        self._collection = collection
+        self._rtt = rtt
+        self._counter = counter
+
+    async def _round_trip(self):
+        self._counter.count += 1
+        await asyncio.sleep(self._rtt)
+
+    async def insert_one(self, document):
+        await self._round_trip()
+        return await self._collection.insert_one(document)
+
+    async def insert_many(self, documents, ordered=True):
+        await self._round_trip()
+        return await self._collection.insert_many(documents, ordered=ordered)
+
+    async def update_one(self, query, update, upsert=False):
+        await self._round_trip()
+        return await self._collection.update_one(query, update, upsert=upsert)
+
+    async def delete_one(self, query):
+        await self._round_trip()
+        return await self._collection.delete_one(query)
+
+    async def delete_many(self, query):
+        return await self._collection.delete_many(query)
+
+    async def bulk_write(self, operations, ordered=True):
+        # mongomock's bulk_write does not accept UpdateOne from recent pymongo
+        # releases, so the operations are applied one by one behind a single round trip.
+        await self._round_trip()
+        totals = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nUpserted": 0, "nRemoved": 0, "writeErrors": []}
+        for operation in operations:
+            if isinstance(operation, UpdateOne):
+                result = await self._collection.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+                totals["nMatched"] += result.matched_count
+                totals["nModified"] += result.modified_count
+                totals["nUpserted"] += 1 if result.upserted_id is not None else 0
+            elif isinstance(operation, DeleteOne):
+                result = await self._collection.delete_one(operation._filter)
+                totals["nRemoved"] += result.deleted_count
+            else:
+                raise TypeError(f"unsupported operation {operation!r}")
+        return SimpleNamespace(bulk_api_result=totals)
+
+
+class StandInDatabase:
+    def __init__(self, database, rtt: float, counter: WriteCommandCounter):
+        self._database = database
+        self._rtt = rtt
+        self._counter = counter
+
+    def __getitem__(self, name):
+        return StandInCollection(self._database[name], self._rtt, self._counter)
+
+
+def documents(n: int, version: int):
+    return (
+        {"_id": f"feedback-{i}", "user_id": f"user-{i % 100}", "interview_id": f"interview-{i}", "feedback_content": {"score": version}}
+        for i in range(n)
+    )
+
+
+async def bench(db, counter: WriteCommandCounter, n: int, chunk_size: int):
+    model = FeedbackModel
+
+    async def one_by_one_create():
+        for document in documents(n, 1):
+            await model.create(db, COLLECTION, document)
+
+    async def one_by_one_update():
+        for document in documents(n, 2):
+            await model.update(db, COLLECTION, {"_id": document["_id"]}, document, upsert=True)
+
+    async def one_by_one_delete():
+        for document in documents(n, 0):
+            await model.delete(db, COLLECTION, {"_id": document["_id"]})
+
+    async def bulk(call):
+        result = await call
+        if not result.ok:
+            raise RuntimeError(f"bulk write errors: {result.errors[:3]}")
+
+    scenarios = [
+        ("create x1", one_by_one_create),
+        ("bulk_create", lambda: bulk(model.bulk_create(db, COLLECTION, documents(n, 1), chunk_size=chunk_size))),
+        ("update x1", one_by_one_update),
+        ("bulk_upsert", lambda: bulk(model.bulk_upsert(db, COLLECTION, documents(n, 2), chunk_size=chunk_size))),
+        ("delete x1", one_by_one_delete),
+        ("bulk_delete", lambda: bulk(model.bulk_delete(db, COLLECTION, ({"_id": d["_id"]} for d in documents(n, 0)), chunk_size=chunk_size))),
+    ]
+    rows = []
+    for name, scenario in scenarios:
+        if name.startswith("create") or name.startswith("bulk_create"):
+            await db[COLLECTION].delete_many({})
+        before = counter.count
+        started = time.perf_counter()
+        await scenario()
+        elapsed = time.perf_counter() - started
+        rows.append((name, elapsed, n / elapsed, counter.count - before))
+    await db[COLLECTION].delete_many({})
+
+    print(f"{'':14}{'seconds':>10}{'docs/s':>12}{'round trips':>14}")
+    for name, elapsed, rate, round_trips in rows:
+        print(f"{name:14}{elapsed:>10.2f}{rate:>12.0f}{round_trips:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--database", default="bench")
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="stand-in latency per call")
+    args = parser.parse_args()
+
+    counter = WriteCommandCounter()
+
+    async def run():
+        if args.mongo_uri:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            client = AsyncIOMotorClient(args.mongo_uri, event_listeners=[counter])
+            db = client[args.database]
+        else:
+            from mongomock_motor import AsyncMongoMockClient
+            db = StandInDatabase(AsyncMongoMockClient()[args.database], args.rtt_ms / 1000, counter)
+        await bench(db, counter, args.documents, args.chunk_size)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
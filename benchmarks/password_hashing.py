@@ -0,0 +1,92 @@
+"""
+Latency of a cheap endpoint while password logins run concurrently, with
+bcrypt called inline on the event loop (the previous behaviour) versus
+through the bounded password-hashing pool.
+
+    python -m benchmarks.password_hashing --logins 40 --login-concurrency 8 --probes 400
+
+The stand-in app runs in its own uvicorn process. Each login verifies a
+bcrypt hash, as /auth/token does once the user row is loaded. Logins the
+pool rejects with 503 are counted as errors.
+"""
+import argparse
+import asyncio
+import os
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.stand_in import serve
+from benchmarks.stats import print_table, run_load
+
+PASSWORD = "correct horse battery staple"
+
+
+def login_app() -> FastAPI:
+    from app.services.auth.passwords import password_hasher, pwd_context
+
+    mode = os.environ["BENCH_LOGIN_MODE"]
+    hashed = pwd_context.hash(PASSWORD)
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if mode == "inline":
+            valid = pwd_context.verify(PASSWORD, hashed)
+        else:
+            valid, _ = await password_hasher.verify_and_update(PASSWORD, hashed)
+        return {"valid": valid}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def bench(url: str, logins: int, login_concurrency: int, probes: int, probe_concurrency: int):
+    async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+
+        async def login():
+            response = await client.post("/login")
+            response.raise_for_status()
+
+        async def probe():
+            response = await client.get("/health")
+            response.raise_for_status()
+
+        async def probe_while_logging_in():
+            # Start probing once the logins are in flight.
+            await asyncio.sleep(0.05)
+            return await run_load(probe, probes, probe_concurrency)
+
+        idle = await run_load(probe, probes, probe_concurrency)
+        login_result, busy = await asyncio.gather(
+            run_load(login, logins, login_concurrency),
+            probe_while_logging_in(),
+        )
+    return idle, busy, login_result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--login-concurrency", type=int, default=8)
+    parser.add_argument("--probes", type=int, default=400)
+    parser.add_argument("--probe-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("inline", "pool"):
+        with serve("benchmarks.password_hashing:login_app", env={"BENCH_LOGIN_MODE": mode}) as stand_in:
+            idle, busy, logins = asyncio.run(bench(
+                stand_in.url, args.logins, args.login_concurrency, args.probes, args.probe_concurrency,
+            ))
+        results[f"{mode}: /health idle"] = idle
+        results[f"{mode}: /health during logins"] = busy
+        results[f"{mode}: /login"] = logins
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
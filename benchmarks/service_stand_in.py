@@ -0,0 +1,20 @@
+"""
+The application under test, as served by benchmarks.load_test: the real
+app.main.app, with MongoDB replaced by an in-memory mongomock database.
+Upstream URLs, PostgreSQL and the other settings come from the environment.
+"""
+
+
+def service_app():
+    # Must run before anything imports app.core.database's mongo_db.
+    from mongomock_motor import AsyncMongoMockClient
+
+    import app.core.database as database
+    from app.config import settings
+
+    database.mongo_client = AsyncMongoMockClient()
+    database.mongo_db = database.mongo_client[settings.MONGO_DB_NAME]
+
+    from app.main import app
+
+    return app
@@ -0,0 +1,122 @@
+"""
+Local stand-in servers for benchmarks: run an ASGI app with uvicorn in a
+child process, optionally over TLS with a throwaway self-signed certificate,
+or a throwaway PostgreSQL server.
+"""
+import datetime
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, NamedTuple, Optional
+
+
+class StandIn(NamedTuple):
+    url: str
+    ca_file: Optional[str] = None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _self_signed_certificate(directory: str) -> tuple[str, str]:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+    import ipaddress
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+@contextmanager
+def serve(
+    app: str,
+    tls: bool = False,
+    env: Optional[Dict[str, str]] = None,
+    lifespan: bool = False,
+    startup_timeout: float = 20,
+) -> Iterator[StandIn]:
+    """
+    Serve the ASGI app factory `app` ("module:function") with uvicorn in a
+    separate process, so the stand-in does not share the benchmark's GIL.
+    Yields its base URL and, over TLS, the certificate clients should trust.
+    `lifespan` runs the app's startup/shutdown (off for plain stand-ins).
+    """
+    port = free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        command = [
+            sys.executable, "-m", "uvicorn", app, "--factory",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--lifespan", "on" if lifespan else "off",
+        ]
+        cert_path = None
+        if tls:
+            cert_path, key_path = _self_signed_certificate(directory)
+            command += ["--ssl-certfile", cert_path, "--ssl-keyfile", key_path]
+        process = subprocess.Popen(command, env={**os.environ, **(env or {})})
+        try:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"stand-in server {app} exited with code {process.returncode}")
+                try:
+                    with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                        break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f"stand-in server {app} did not start")
+                    time.sleep(0.05)
+            yield StandIn(f"{'https' if tls else 'http'}://127.0.0.1:{port}", cert_path)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+@contextmanager
+def postgres() -> Iterator[str]:
+    """
+    Start a throwaway PostgreSQL server (pgserver's bundled binaries, data in a
+    temporary directory removed on exit) and yield its asyncpg database URL.
+    """
+    import pgserver
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = pgserver.get_server(directory, cleanup_mode="stop")
+        try:
+            yield server.get_uri().replace("postgresql://", "postgresql+asyncpg://", 1)
+        finally:
+            server.cleanup()
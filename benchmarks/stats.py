@@ -0,0 +1,62 @@
+"""
+Latency/throughput summaries shared by the benchmark scripts.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": len(values) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+async def run_load(call: Callable[[], Awaitable[object]], requests: int, concurrency: int) -> Dict[str, float]:
+    """
+    Run `call` `requests` times with `concurrency` concurrent workers.
+    """
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                await call()
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def print_table(results: Dict[str, Dict[str, float]]):
+    columns = ["requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    width = max(len(name) for name in results) + 2
+    print("".ljust(width) + "".join(column.rjust(11) for column in columns))
+    for name, result in results.items():
+        cells = "".join(
+            (f"{result[column]:.2f}" if isinstance(result[column], float) else str(result[column])).rjust(11)
+            for column in columns
+        )
+        print(name.ljust(width) + cells)
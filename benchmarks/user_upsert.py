@@ -0,0 +1,151 @@
+"""
+OAuth login user write path: the previous SELECT-then-modify-then-commit
+flow against the single INSERT ... ON CONFLICT ... RETURNING upsert, on a
+real PostgreSQL.
+
+    python -m benchmarks.user_upsert --database-url postgresql+asyncpg://postgres@127.0.0.1:5432/postgres
+
+Scenarios:
+- race: --concurrency simultaneous first logins of the same new account;
+- returning: --logins logins of existing accounts, --concurrency at a time.
+Round trips count every statement plus BEGIN/COMMIT/ROLLBACK, per login.
+"""
+import argparse
+import asyncio
+import itertools
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, event, func, or_, select
+
+from app.core.database import build_engine, build_sessionmaker
+from app.models.postgres.user_model import Base, User
+from app.services.auth.oauth_service import oauth_service
+from benchmarks.stats import summarize
+
+
+async def legacy_handle_google_user(user_info, db):
+    """The previous implementation of OAuthService._handle_google_user."""
+    result = await db.execute(select(User).where(or_(User.google_id == user_info["id"], User.email == user_info["email"])))
+    user = result.scalar_one_or_none()
+    if user:
+        if not user.google_id:
+            user.google_id = user_info["id"]
+        if user.auth_providers is None:
+            user.auth_providers = []
+        if "google" not in user.auth_providers:
+            user.auth_providers = user.auth_providers + ["google"]
+        user.last_login = datetime.utcnow()
+        user.updated_at = datetime.utcnow()
+        user.name = user_info["name"]
+        user.picture_url = user_info.get("picture")
+    else:
+        user = User(
+            email=user_info["email"], name=user_info["name"], picture_url=user_info.get("picture"),
+            google_id=user_info["id"], auth_providers=["google"], is_active=True,
+            created_at=datetime.utcnow(), updated_at=datetime.utcnow(), last_login=datetime.utcnow(),
+        )
+        db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+IMPLEMENTATIONS = {
+    "select + commit + refresh": legacy_handle_google_user,
+    "upsert returning": oauth_service._handle_google_user,
+}
+
+
+class RoundTrips:
+    def __init__(self, engine):
+        self.count = 0
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._bump)
+        for name in ("begin", "commit", "rollback"):
+            event.listen(sync_engine, name, self._bump)
+
+    def _bump(self, *args, **kwargs):
+        self.count += 1
+
+
+def user_info(key: str) -> dict:
+    return {"id": f"google-{key}", "email": f"{key}@bench-upsert.example.com", "name": f"User {key}", "picture": None}
+
+
+async def login(session_factory, handle, info):
+    async with session_factory() as db:
+        return await handle(info, db)
+
+
+async def race(session_factory, handle, concurrency: int) -> dict:
+    info = user_info(f"race-{uuid.uuid4().hex[:8]}")
+    outcomes = await asyncio.gather(
+        *(login(session_factory, handle, info) for _ in range(concurrency)),
+        return_exceptions=True,
+    )
+    errors = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    async with session_factory() as db:
+        rows = await db.scalar(select(func.count()).select_from(User).where(User.email == info["email"]))
+        providers = await db.scalar(select(User.auth_providers).where(User.email == info["email"]))
+    return {"errors": len(errors), "rows": rows, "auth_providers": providers}
+
+
+async def returning(session_factory, handle, logins: int, concurrency: int, users: int) -> dict:
+    keys = itertools.cycle(range(users))
+    remaining = iter(range(logins))
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                await login(session_factory, handle, user_info(f"returning-{next(keys)}"))
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def bench(database_url: str, logins: int, concurrency: int, users: int):
+    engine = build_engine(database_url, pool_mode="queue", pgbouncer=False)
+    session_factory = build_sessionmaker(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(delete(User).where(User.email.like("%@bench-upsert.example.com")))
+    round_trips = RoundTrips(engine)
+
+    for name, handle in IMPLEMENTATIONS.items():
+        race_result = await race(session_factory, handle, concurrency)
+        for key in range(users):  # accounts exist before the measured logins
+            await login(session_factory, handle, user_info(f"returning-{key}"))
+        before = round_trips.count
+        result = await returning(session_factory, handle, logins, concurrency, users)
+        per_login = (round_trips.count - before) / max(1, result["requests"] + result["errors"])
+        print(f"{name}")
+        print(f"  race of {concurrency} first logins: {race_result['errors']} errors, "
+              f"{race_result['rows']} row(s), auth_providers={race_result['auth_providers']}")
+        print(f"  {result['requests']} returning logins: {per_login:.1f} round trips/login, "
+              f"{result['rps']:.0f} logins/s, p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+              f"{result['errors']} errors")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--logins", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(bench(args.database_url, args.logins, args.concurrency, args.users))
+
+
+if __name__ == "__main__":
+    main()